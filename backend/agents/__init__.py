@@ -4,33 +4,94 @@ Contoso Agent Factory
 This module provides a centralized way to create all Contoso agents.
 """
 
+from semantic_kernel.agents import OrchestrationHandoffs
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from utils.tool_context import ToolContext
+from utils.tool_trace import tool_trace
 from .alex_orchestrator import AlexOrchestrator
 from .billing_agent import BillingAgent
 from .plan_agent import PlanAgent
 from .support_agent import SupportAgent
 
-def create_contoso_agents(service: AzureChatCompletion):
+def create_contoso_agents(service: AzureChatCompletion, context: ToolContext = None):
     """
     Create all Contoso agents with the given service.
     
     Args:
         service: Azure OpenAI chat completion service
+        context: Session context shared by the agents' tools (see utils.tool_context)
         
     Returns:
         Tuple of (alex, billing_agent, plan_agent, support_agent)
     """
     alex = AlexOrchestrator(service).agent
-    billing_agent = BillingAgent(service).agent
+    billing_agent = BillingAgent(service, context).agent
     plan_agent = PlanAgent(service).agent
     support_agent = SupportAgent(service).agent
     
+    # Cap each agent's concurrent tool calls and record their timings
+    for agent in (alex, billing_agent, plan_agent, support_agent):
+        tool_trace.install(agent, context)
+    
     return alex, billing_agent, plan_agent, support_agent
 
+def create_contoso_handoffs(triage_agent, billing_agent, plan_agent, support_agent) -> OrchestrationHandoffs:
+    """
+    Define the handoff relationships between the Contoso agents.
+    
+    Shared by the terminal demo and the web server so both use the exact same graph.
+    
+    Args:
+        triage_agent: Alex, the customer-facing triage agent
+        billing_agent: Billing specialist agent
+        plan_agent: Plan specialist agent
+        support_agent: Support specialist agent
+        
+    Returns:
+        OrchestrationHandoffs describing who can transfer to whom
+    """
+    return (
+        OrchestrationHandoffs()
+        .add_many(
+            source_agent=triage_agent.name,
+            target_agents={
+                billing_agent.name: "Transfer to this agent if the customer has billing issues, high bills, or wants bill analysis",
+                plan_agent.name: "Transfer to this agent if the customer asks about roaming plans, addons, or current plan details", 
+                support_agent.name: "Transfer to this agent if the customer wants to speak to a human or needs ticket creation"
+            }
+        )
+        .add(
+            source_agent=billing_agent.name,
+            target_agent=triage_agent.name,
+            description="Transfer back to triage agent after completing billing analysis"
+        )
+        .add(
+            source_agent=billing_agent.name,
+            target_agent=support_agent.name,
+            description="Transfer to support agent if billing issue cannot be resolved with available data"
+        )
+        .add(
+            source_agent=plan_agent.name,
+            target_agent=triage_agent.name,
+            description="Transfer back to triage agent after providing plan information"
+        )
+        .add(
+            source_agent=plan_agent.name,
+            target_agent=support_agent.name,
+            description="Transfer to support agent if plan issue cannot be resolved with available information"
+        )
+        .add(
+            source_agent=support_agent.name,
+            target_agent=triage_agent.name,
+            description="Transfer back to triage agent after creating support ticket"
+        )
+    )
+
 __all__ = [
     'AlexOrchestrator',
     'BillingAgent', 
     'PlanAgent',
     'SupportAgent',
-    'create_contoso_agents'
+    'create_contoso_agents',
+    'create_contoso_handoffs'
 ]
\ No newline at end of file
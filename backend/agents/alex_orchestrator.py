@@ -1,5 +1,6 @@
 from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from utils.prompt_layout import stable_text
 
 class AlexOrchestrator:
     def __init__(self, service: AzureChatCompletion):
@@ -59,6 +60,6 @@ Remember: You're the face of Contoso - be helpful, friendly, and solution-orient
         self.agent = ChatCompletionAgent(
             service=service,
             name=self.name,
-            instructions=self.instructions,
+            instructions=stable_text(self.instructions),
             description=self.description
         )
\ No newline at end of file
@@ -1,10 +1,12 @@
 from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from tools.billing_tools import BillingTools
+from utils.prompt_layout import stable_text
+from utils.tool_context import ToolContext
 from utils.widget_manager import widget_manager
 
 class BillingAgent:
-    def __init__(self, service: AzureChatCompletion):
+    def __init__(self, service: AzureChatCompletion, context: ToolContext = None):
         self.name = "BillingAgent"
         self.description = "Specialist agent for analyzing bills and identifying high charges"
         
@@ -20,6 +22,7 @@ When analyzing high bills:
 - First get the recent bills overview using get_recent_bills
 - Then get detailed line items for specific bills using get_bill_details
 - Use analyze_high_charges to identify main contributors
+- Use compare_bill_charges to compare several months in a single call instead of analyzing bills one by one
 - Reference specific line items (with dates and amounts) when explaining
 - Always verify if services were included in the plan before suggesting solutions
 
@@ -28,6 +31,8 @@ Example approach:
 2. Use analyze_high_charges to identify the main issues and specific charges
 3. Optionally use get_bill_details if customer needs detailed line-by-line breakdown
 
+Calls that do not depend on each other's results (e.g. get_recent_bills and analyze_high_charges for a bill the customer named) should be requested together in one response - they run in parallel.
+
 File/artifact References - Frontend Integration:
 - When your tools generate files (charts or CSV), you may include the file reference in your response for better user experience. The frontend will automatically render these as interactive charts, downloadable files, or embedded content.
 - Do not render artifacts when they do not add value or have previously been shared in the conversation. 
@@ -54,7 +59,7 @@ You do not recommend plans or addons - focus only on explaining charges with fil
         self.agent = ChatCompletionAgent(
             service=service,
             name=self.name,
-            instructions=self.instructions,
+            instructions=stable_text(self.instructions),
             description=self.description,
-            plugins=[BillingTools()]
+            plugins=[BillingTools(context)]
         )
\ No newline at end of file
@@ -1,6 +1,7 @@
 from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from tools.plan_tools import PlanTools
+from utils.prompt_layout import stable_text
 from utils.widget_manager import widget_manager
 
 class PlanAgent:
@@ -26,6 +27,7 @@ When making recommendations:
 - Show potential savings compared to pay-as-you-go charges
 - Mention activation timeframes and billing cycle impacts
 - Always provide specific plan/addon IDs for easy reference
+- Request independent tools (e.g. get_current_plan and get_roaming_plans) together in one response so they run in parallel
 
 IMPORTANT: Use widget references to display interactive plan and addon information:
 - For current plan: Include [WIDGET:current_plan:[]] in your response
@@ -46,7 +48,7 @@ Always use your plan tools to get accurate, up-to-date information."""
         self.agent = ChatCompletionAgent(
             service=service,
             name=self.name,
-            instructions=self.instructions,
+            instructions=stable_text(self.instructions),
             description=self.description,
             plugins=[PlanTools()]
         )
\ No newline at end of file
@@ -1,6 +1,7 @@
 from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 from tools.support_tools import SupportTools
+from utils.prompt_layout import stable_text
 
 class SupportAgent:
     def __init__(self, service: AzureChatCompletion):
@@ -45,7 +46,7 @@ Do not attempt to resolve issues yourself - create the ticket immediately so a h
         self.agent = ChatCompletionAgent(
             service=service,
             name=self.name,
-            instructions=self.instructions,
+            instructions=stable_text(self.instructions),
             description=self.description,
             plugins=[self.support_tools]
         )
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Artifact rendering throughput
+Renders distinct monthly trend charts concurrently on the tool executor's thread pool
+and on warm artifact worker processes, for increasing worker counts
+
+Run from the backend directory:
+    python benchmarks/artifact_throughput.py --charts 48 --workers 1,2,4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.artifact_jobs import render_chart
+from utils.artifact_workers import ArtifactWorkers
+from utils.tool_executor import ToolExecutor
+
+MONTHS = ["Jun 2024", "Jul 2024", "Aug 2024", "Sep 2024", "Oct 2024", "Nov 2024"]
+
+
+def chart_spec(index: int) -> dict:
+    # Distinct data per chart so nothing could be served from a cache
+    return {
+        "chart": "monthly_trend",
+        "months": MONTHS,
+        "amounts": [40.0 + (index * 7 + month * 13) % 90 for month in range(len(MONTHS))],
+        "format": "png"
+    }
+
+
+async def run_threads(workers: int, charts: int, out_dir: Path) -> dict:
+    executor = ToolExecutor(cpu_workers=workers)
+    try:
+        started = time.perf_counter()
+        await executor.run("cpu", render_chart, chart_spec(-1), str(out_dir / "first.png"))
+        first = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            executor.run("cpu", render_chart, chart_spec(i), str(out_dir / f"thread_{i}.png"))
+            for i in range(charts)
+        ))
+        return {"first_chart_s": first, "wall_s": time.perf_counter() - started}
+    finally:
+        executor.shutdown()
+
+
+async def run_processes(workers: int, charts: int, out_dir: Path) -> dict:
+    pool = ArtifactWorkers(workers=workers)
+    try:
+        started = time.perf_counter()
+        pool.start()
+        await pool.render_chart(chart_spec(-1), out_dir / "first.png")
+        first = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            pool.render_chart(chart_spec(i), out_dir / f"process_{i}.png")
+            for i in range(charts)
+        ))
+        return {"first_chart_s": first, "wall_s": time.perf_counter() - started}
+    finally:
+        pool.shutdown()
+
+
+async def main(charts: int, worker_counts: list) -> None:
+    print(f"Rendering {charts} charts per run on {os.cpu_count()} CPUs\n")
+    print(f"{'mode':<10}{'workers':>8}{'first chart (s)':>17}{'wall (s)':>10}{'charts/s':>10}{'speedup':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        for mode, runner in (("thread", run_threads), ("process", run_processes)):
+            baseline = None
+            for workers in worker_counts:
+                result = await runner(workers, charts, out_dir)
+                rate = charts / result["wall_s"]
+                baseline = baseline or rate
+                print(f"{mode:<10}{workers:>8}{result['first_chart_s']:>17.3f}{result['wall_s']:>10.2f}"
+                      f"{rate:>10.1f}{rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--charts", type=int, default=48, help="Charts rendered per run")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to compare")
+    args = parser.parse_args()
+    asyncio.run(main(args.charts, [int(w) for w in args.workers.split(",")]))
@@ -0,0 +1,68 @@
+"""
+Connection reuse check for the shared chat service
+Sends concurrent completions through get_chat_service() to the local stub server and
+reports how many TCP connections were opened for how many requests
+
+Run from the backend directory:
+    python benchmarks/connection_reuse.py --requests 200 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from semantic_kernel.connectors.ai.open_ai import AzureChatPromptExecutionSettings
+from semantic_kernel.contents import ChatHistory
+
+from benchmarks.stub_openai_server import run_stub_server, state
+
+
+async def run(requests: int, concurrency: int) -> None:
+    # Imported after the environment points at the stub
+    from utils.service_factory import chat_service_factory, get_chat_service
+
+    service = get_chat_service()
+    settings = AzureChatPromptExecutionSettings()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            history = ChatHistory()
+            history.add_user_message(f"ping {index}")
+            await service.get_chat_message_content(history, settings)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    await chat_service_factory.aclose()
+
+    print(f"Requests:          {requests}")
+    print(f"Concurrency:       {concurrency}")
+    print(f"TCP connections:   {len(state.connections)}")
+    print(f"Total time:        {elapsed:.2f}s ({requests / elapsed:.1f} req/s)")
+    print(f"Pool settings:     {chat_service_factory.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8899)
+    args = parser.parse_args()
+
+    with run_stub_server(port=args.port) as base_url:
+        os.environ["AZURE_OPENAI_ENDPOINT"] = base_url
+        os.environ["AZURE_OPENAI_API_KEY"] = "stub"
+        os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"] = "stub-deployment"
+        # The stub is plain HTTP/1.1
+        os.environ["AZURE_OPENAI_HTTP2"] = "false"
+        asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
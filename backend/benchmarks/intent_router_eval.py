@@ -0,0 +1,108 @@
+"""
+Intent router accuracy and latency
+Classifies a held-out labelled utterance set (not used to fit the router) and reports
+how often messages are routed straight to a specialist, how often those routes are
+right, and how long classification takes
+
+Run from the backend directory:
+    python benchmarks/intent_router_eval.py
+    python benchmarks/intent_router_eval.py --min-score 0.25 --min-margin 0.05
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.intent_router import TRIAGE_LABEL, IntentRouter
+
+# (utterance, agent that should answer it); "Alex" means triage should handle it
+LABELLED = [
+    ("my bill is way higher than last month, why?", "BillingAgent"),
+    ("what's the £89.50 charge on my bill", "BillingAgent"),
+    ("can you show me a breakdown of my October bill", "BillingAgent"),
+    ("why am I paying for calls to India", "BillingAgent"),
+    ("download the line items for my latest statement", "BillingAgent"),
+    ("how do my last few bills compare", "BillingAgent"),
+    ("I got charged extra for roaming in America", "BillingAgent"),
+    ("what made my November bill so expensive", "BillingAgent"),
+    ("explain the charges that weren't in my plan", "BillingAgent"),
+    ("show my billing history chart", "BillingAgent"),
+    ("which roaming pass should I get for New York", "PlanAgent"),
+    ("what add-ons can I buy", "PlanAgent"),
+    ("is calling abroad part of my plan", "PlanAgent"),
+    ("how much data have I used so far", "PlanAgent"),
+    ("tell me about my current plan", "PlanAgent"),
+    ("I'm going to Spain, do I need a roaming bundle?", "PlanAgent"),
+    ("can I get extra data", "PlanAgent"),
+    ("what's included in Contoso Ultimate Entertainment", "PlanAgent"),
+    ("are there cheaper international calling options", "PlanAgent"),
+    ("when is my contract up", "PlanAgent"),
+    ("get me a person please", "SupportAgent"),
+    ("I want to make a complaint", "SupportAgent"),
+    ("have someone ring me back", "SupportAgent"),
+    ("raise a ticket for this", "SupportAgent"),
+    ("I'd rather talk to a human agent", "SupportAgent"),
+    ("escalate my issue", "SupportAgent"),
+    ("hey", "Alex"),
+    ("thanks so much", "Alex"),
+    ("sure", "Alex"),
+    ("what else can you help with", "Alex"),
+    ("why is my bill high and which roaming plan should I buy", "Alex"),
+    ("ok great", "Alex"),
+]
+
+
+def evaluate(router: IntentRouter, repeats: int) -> None:
+    outcomes = Counter()
+    mistakes = []
+    for text, expected in LABELLED:
+        routed = router.route(text) or TRIAGE_LABEL
+        if routed == expected:
+            outcomes["correct"] += 1
+        elif routed == TRIAGE_LABEL:
+            # Safe miss: triage still gets it right, only the latency saving is lost
+            outcomes["fell_back"] += 1
+        else:
+            outcomes["misrouted"] += 1
+            mistakes.append((text, expected, routed))
+        if expected != TRIAGE_LABEL:
+            outcomes["specialist_expected"] += 1
+            outcomes["specialist_routed"] += int(routed == expected)
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for text, _ in LABELLED:
+            router.route(text)
+    per_message_us = (time.perf_counter() - started) / (repeats * len(LABELLED)) * 1e6
+
+    total = len(LABELLED)
+    routed = sum(1 for text, _ in LABELLED if router.route(text))
+    print(f"Utterances:            {total}")
+    print(f"Accuracy:              {outcomes['correct'] / total:.0%}")
+    print(f"Triage hops skipped:   {outcomes['specialist_routed']}/{outcomes['specialist_expected']} specialist messages")
+    print(f"Route precision:       {(routed - outcomes['misrouted']) / routed:.0%}" if routed else "Route precision:       n/a")
+    print(f"Fell back to triage:   {outcomes['fell_back']}")
+    print(f"Misrouted:             {outcomes['misrouted']}")
+    print(f"Classification time:   {per_message_us:.0f} µs/message")
+    for text, expected, routed_to in mistakes:
+        print(f"  misrouted: {text!r} expected {expected}, got {routed_to}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-score", type=float, help="Override INTENT_ROUTER_MIN_SCORE")
+    parser.add_argument("--min-margin", type=float, help="Override INTENT_ROUTER_MIN_MARGIN")
+    parser.add_argument("--repeats", type=int, default=200, help="Passes over the set for timing")
+    args = parser.parse_args()
+
+    router = IntentRouter()
+    router.enabled = True
+    if args.min_score is not None:
+        router.min_score = args.min_score
+    if args.min_margin is not None:
+        router.min_margin = args.min_margin
+    evaluate(router, args.repeats)
@@ -0,0 +1,90 @@
+"""
+Prompt prefix reuse harness
+Runs a scripted multi-turn conversation through each Contoso agent against the local
+stub server, then compares consecutive requests from the same agent segment by segment
+(system instructions, tool schemas, history) to report how much of each prompt repeats
+the previous one byte for byte - the part provider-side prompt caching can reuse
+
+Run from the backend directory:
+    python benchmarks/prompt_prefix_reuse.py --turns 6
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_openai_server import run_stub_server, state
+
+SCRIPT = [
+    "Hi, my last bill was much higher than usual",
+    "Can you break down the November charges?",
+    "Was the roaming in the USA included in my plan?",
+    "What roaming pass would you suggest for another trip?",
+    "Are there add-ons for international calls?",
+    "Please arrange for someone to call me back",
+]
+
+
+async def run(turns: int) -> None:
+    # Imported after the environment points at the stub
+    from agents import create_contoso_agents
+    from utils.prompt_layout import MIN_CACHEABLE_TOKENS, request_layout, shared_prefix_bytes
+    from utils.service_factory import chat_service_factory, get_chat_service
+    from utils.session_state import SessionState
+
+    agents = create_contoso_agents(get_chat_service())
+    for agent in agents:
+        session = SessionState(f"prefix-{agent.name}")
+        for turn in range(turns):
+            session.add_user_message(SCRIPT[turn % len(SCRIPT)])
+            response = await agent.get_response(messages=session.get_task())
+            session.add_agent_message(response.message)
+    await chat_service_factory.aclose()
+
+    # Requests are attributed to agents by their system message, which is the instructions
+    instructions = {agent.instructions: agent.name for agent in agents}
+    previous = {}
+    rows = {agent.name: {"requests": 0, "prompt": 0, "shared": 0, "cacheable": 0} for agent in agents}
+    for body in state.requests:
+        system = next((m.get("content", "") for m in body.get("messages", []) if m.get("role") == "system"), "")
+        name = instructions.get(system, "unknown")
+        segments = request_layout(body)
+        prompt = sum(len(s.encode("utf-8")) for s in segments)
+        shared = shared_prefix_bytes(previous.get(name), segments)
+        previous[name] = segments
+
+        row = rows.setdefault(name, {"requests": 0, "prompt": 0, "shared": 0, "cacheable": 0})
+        row["requests"] += 1
+        row["prompt"] += prompt
+        row["shared"] += shared
+        # ~4 bytes per token; shorter prefixes are not cached by the provider
+        row["cacheable"] += shared if shared // 4 >= MIN_CACHEABLE_TOKENS else 0
+
+    print(f"{'agent':<14}{'requests':>9}{'avg prompt B':>14}{'avg reused B':>14}{'reuse':>8}{'cacheable B/turn':>18}")
+    for name, row in rows.items():
+        if not row["requests"]:
+            continue
+        requests = row["requests"]
+        print(f"{name:<14}{requests:>9}{row['prompt'] / requests:>14.0f}{row['shared'] / requests:>14.0f}"
+              f"{row['shared'] / row['prompt']:>8.0%}{row['cacheable'] / requests:>18.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=6, help="Customer turns per agent")
+    parser.add_argument("--port", type=int, default=8899)
+    args = parser.parse_args()
+
+    with run_stub_server(port=args.port) as base_url:
+        os.environ["AZURE_OPENAI_ENDPOINT"] = base_url
+        os.environ["AZURE_OPENAI_API_KEY"] = "stub"
+        os.environ.setdefault("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", "stub-deployment")
+        asyncio.run(run(args.turns))
+
+
+if __name__ == "__main__":
+    main()
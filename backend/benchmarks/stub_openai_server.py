@@ -0,0 +1,220 @@
+"""
+Local stub of the (Azure) OpenAI chat completions API for Contoso Agent Demo
+Lets the service factory, benchmarks and harnesses run without real Azure credentials
+
+Run standalone:
+    python benchmarks/stub_openai_server.py --port 8899
+
+Then point the app at it (Semantic Kernel only accepts https endpoints, so the stub
+serves TLS with a self-signed certificate written next to it on start-up):
+    AZURE_OPENAI_ENDPOINT=https://127.0.0.1:8899
+    AZURE_OPENAI_API_KEY=stub
+    AZURE_OPENAI_CHAT_DEPLOYMENT_NAME=stub-deployment
+    SSL_CERT_FILE=<printed certificate path>
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class StubState:
+    """Requests and client connections observed by the stub"""
+
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+        self.connections: Set[Tuple[str, int]] = set()
+        self.latency_seconds = 0.0
+
+    def reset(self) -> None:
+        self.requests.clear()
+        self.connections.clear()
+
+
+state = StubState()
+app = FastAPI(title="Stub OpenAI-compatible server")
+
+
+def _reply_for(body: Dict[str, Any]) -> str:
+    """Deterministic reply that echoes the last user message"""
+    for message in reversed(body.get("messages", [])):
+        if message.get("role") == "user":
+            content = message.get("content")
+            if isinstance(content, list):
+                content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+            return f"Stub reply to: {content}"
+    return "Stub reply"
+
+
+def _usage(body: Dict[str, Any], reply: str) -> Dict[str, int]:
+    """Rough token usage (4 characters per token) so clients see realistic fields"""
+    prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+    completion_tokens = max(1, len(reply) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+async def _chat_completions(request: Request, model: str):
+    body = await request.json()
+    state.requests.append(body)
+    if request.client:
+        state.connections.add((request.client.host, request.client.port))
+
+    if state.latency_seconds:
+        await asyncio.sleep(state.latency_seconds)
+
+    reply = _reply_for(body)
+    created = int(time.time())
+
+    if body.get("stream"):
+        async def event_stream():
+            words = reply.split(" ")
+            for index, word in enumerate(words):
+                piece = word if index == 0 else f" {word}"
+                chunk = {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    return JSONResponse({
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": reply},
+            "finish_reason": "stop"
+        }],
+        "usage": _usage(body, reply)
+    })
+
+
+@app.post("/openai/deployments/{deployment}/chat/completions")
+async def azure_chat_completions(deployment: str, request: Request):
+    """Azure OpenAI route used by AzureChatCompletion"""
+    return await _chat_completions(request, deployment)
+
+
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: Request):
+    """Plain OpenAI route"""
+    return await _chat_completions(request, "stub-model")
+
+
+def write_certificate(directory: Path, host: str = "127.0.0.1") -> Tuple[Path, Path]:
+    """
+    Write a self-signed certificate for host
+
+    Returns:
+        (certificate file, key file); the certificate doubles as the CA bundle clients trust
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(host))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_file = directory / "stub-cert.pem"
+    key_file = directory / "stub-key.pem"
+    cert_file.write_bytes(certificate.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ))
+    return cert_file, key_file
+
+
+@contextmanager
+def run_stub_server(host: str = "127.0.0.1", port: int = 8899) -> Iterator[str]:
+    """
+    Serve the stub over TLS from a background thread
+
+    SSL_CERT_FILE points at the stub's certificate while the server runs, so
+    httpx clients created inside the block trust it.
+
+    Yields:
+        Base URL to use as AZURE_OPENAI_ENDPOINT
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        cert_file, key_file = write_certificate(Path(directory), host)
+        server = uvicorn.Server(uvicorn.Config(
+            app, host=host, port=port, log_level="warning",
+            ssl_certfile=str(cert_file), ssl_keyfile=str(key_file)
+        ))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+
+        previous = os.environ.get("SSL_CERT_FILE")
+        os.environ["SSL_CERT_FILE"] = str(cert_file)
+        try:
+            yield f"https://{host}:{port}"
+        finally:
+            if previous is None:
+                os.environ.pop("SSL_CERT_FILE", None)
+            else:
+                os.environ["SSL_CERT_FILE"] = previous
+            server.should_exit = True
+            thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency", type=float, default=0.0, help="Artificial delay per request in seconds")
+    args = parser.parse_args()
+
+    state.latency_seconds = args.latency
+    cert_file, key_file = write_certificate(Path(__file__).resolve().parent, args.host)
+    print(f"SSL_CERT_FILE={cert_file}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info",
+                ssl_certfile=str(cert_file), ssl_keyfile=str(key_file))
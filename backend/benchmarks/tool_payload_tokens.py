@@ -0,0 +1,81 @@
+"""
+Tool payload token report
+Calls every tool with indented JSON (the previous format) and with compact,
+budgeted serialization, and reports the tokens each result costs in the prompt
+
+Run from the backend directory (charts and CSV exports go to a temporary directory):
+    python benchmarks/tool_payload_tokens.py
+"""
+
+import argparse
+import asyncio
+import inspect
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+if __name__ == "__main__":
+    # Set before the tools import the file manager; spawned artifact workers inherit it
+    artifacts_dir = tempfile.TemporaryDirectory(prefix="tool-payload-artifacts-")
+    os.environ["ARTIFACTS_DIR"] = artifacts_dir.name
+
+from tools.billing_tools import BillingTools
+from tools.plan_tools import PlanTools
+from tools.support_tools import SupportTools
+from utils.tool_cache import tool_cache
+from utils.tool_output import tool_output
+
+CALLS = [
+    (PlanTools, "get_current_plan", {}),
+    (PlanTools, "get_roaming_plans", {}),
+    (PlanTools, "get_available_addons", {}),
+    (PlanTools, "get_usage_summary", {}),
+    (PlanTools, "check_feature_inclusion", {"feature": "roaming"}),
+    (BillingTools, "get_recent_bills", {}),
+    (BillingTools, "get_bill_details", {"bill_id": "CS-BILL-202411"}),
+    (BillingTools, "analyze_high_charges", {"bill_id": "CS-BILL-202411"}),
+    (BillingTools, "compare_bill_charges", {"bill_ids": ["CS-BILL-202411", "CS-BILL-202410", "CS-BILL-202409"]}),
+    (SupportTools, "create_support_ticket", {"issue_summary": "Unexpected roaming charges on November bill", "priority": "high"}),
+    (SupportTools, "get_widget_link", {"action_type": "roaming_activation", "item_id": "ROAM-USA-7"}),
+]
+
+
+async def call(tools, name: str, arguments: dict) -> str:
+    result = getattr(tools, name)(**arguments)
+    return await result if inspect.isawaitable(result) else result
+
+
+async def main(show: bool) -> None:
+    # Every call must run the tool, not return a cached string from the other mode
+    tool_cache.enabled = False
+    instances = {cls: cls() for cls in {cls for cls, _, _ in CALLS}}
+
+    print(f"Tokenizer: {tool_output.stats()['tokenizer']}\n")
+    print(f"{'tool':<26}{'indented':>10}{'compact':>10}{'saved':>8}{'budget':>8}")
+    totals = [0, 0]
+    for cls, name, arguments in CALLS:
+        tool_output.enabled = False
+        before = await call(instances[cls], name, arguments)
+        tool_output.enabled = True
+        after = await call(instances[cls], name, arguments)
+
+        before_tokens = tool_output.count_tokens(before)
+        after_tokens = tool_output.count_tokens(after)
+        totals[0] += before_tokens
+        totals[1] += after_tokens
+        print(f"{name:<26}{before_tokens:>10}{after_tokens:>10}"
+              f"{1 - after_tokens / before_tokens:>8.0%}{tool_output.budget_for(name):>8}")
+        if show:
+            print(f"  {after}\n")
+
+    print(f"{'total':<26}{totals[0]:>10}{totals[1]:>10}{1 - totals[1] / totals[0]:>8.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--show", action="store_true", help="Print each compact payload")
+    args = parser.parse_args()
+    asyncio.run(main(args.show))
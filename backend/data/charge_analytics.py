@@ -0,0 +1,85 @@
+"""
+Charge analytics for Contoso Agent Demo
+Summarises additional (out-of-plan) charges for many bills or customers in one grouped pass
+"""
+
+from typing import Any, Dict, List
+
+import pandas as pd
+
+# Charges outside this location count as roaming
+HOME_LOCATION = "UK"
+
+
+def analyze_charges(frame: pd.DataFrame, group_by: str = "bill_id", top_k: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute the high-charge summary for every group in a line item frame
+
+    Args:
+        frame: Typed line items with a `bill_id`/`customer_id` column (see LineItemStore.frame)
+        group_by: Column to summarise by - "bill_id" or "customer_id"
+        top_k: Number of largest individual charges to report per group
+
+    Returns:
+        Mapping of group key to the same summary shape as DummyDataStore.analyze_high_charges
+    """
+    groups = frame[group_by]
+    keys = list(groups.cat.categories) if hasattr(groups, "cat") else list(dict.fromkeys(groups))
+
+    extra = frame[~frame["included_in_plan"].to_numpy(dtype=bool)]
+    charge = extra["charge"]
+    is_roaming = (extra["location"] != HOME_LOCATION).to_numpy()
+    is_international_call = ((extra["type"] == "CALL") & (extra["location"] == HOME_LOCATION)).to_numpy()
+
+    # Every total in a single groupby over precomputed masked columns
+    totals = pd.DataFrame({
+        group_by: extra[group_by],
+        "total": charge,
+        "roaming": charge.where(is_roaming, 0.0),
+        "international": charge.where(is_international_call, 0.0)
+    }).groupby(group_by, observed=True, sort=False).sum()
+
+    # Sorted by type then location, the order main_contributors has always had
+    contributors = (
+        extra.groupby([group_by, "type", "location"], observed=True, sort=True)["charge"]
+        .agg(["sum", "count"])
+        .reset_index()
+        .rename(columns={"sum": "total_charge"})
+    )
+
+    # Stable descending sort keeps the first occurrence on ties, like nlargest
+    top = extra.sort_values("charge", ascending=False, kind="stable").groupby(group_by, observed=True).head(top_k)
+
+    contributors_by_group = {
+        key: part[["type", "location", "total_charge", "count"]].to_dict("records")
+        for key, part in contributors.groupby(group_by, observed=True, sort=False)
+    }
+    top_by_group = {
+        key: part[["date", "description", "location", "charge"]].to_dict("records")
+        for key, part in top.groupby(group_by, observed=True, sort=False)
+    }
+
+    results = {}
+    for key in keys:
+        row = totals.loc[key] if key in totals.index else None
+        results[key] = {
+            "total_additional_charges": float(row["total"]) if row is not None else 0.0,
+            "main_contributors": contributors_by_group.get(key, []),
+            f"top_{top_k}_charges": top_by_group.get(key, []),
+            "roaming_total": float(row["roaming"]) if row is not None else 0.0,
+            "international_calls_total": float(row["international"]) if row is not None else 0.0
+        }
+    return results
+
+
+def compare_totals(analyses: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Side-by-side headline totals for each analysed group, in the given order"""
+    return [
+        {
+            "id": key,
+            "total_additional_charges": round(analysis["total_additional_charges"], 2),
+            "roaming_total": round(analysis["roaming_total"], 2),
+            "international_calls_total": round(analysis["international_calls_total"], 2)
+        }
+        for key, analysis in analyses.items()
+    ]
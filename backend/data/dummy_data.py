@@ -1,7 +1,42 @@
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
+import os
 import pandas as pd
-from io import StringIO
+from data.line_item_store import LineItemStore
+from data.charge_analytics import analyze_charges
+
+# Raw line items for the demo bills, parsed once into the LineItemStore
+BILL_LINE_ITEMS_CSV = {
+    # November bill with roaming charges from USA
+    "CS-BILL-202411": """date,time,type,description,duration,location,charge,included_in_plan
+2024-11-03,14:23:00,CALL,Call to UK mobile,15 mins,USA,12.50,No
+2024-11-03,18:45:00,CALL,Call to UK landline,8 mins,USA,8.00,No
+2024-11-04,09:15:00,DATA,Data usage 500MB,N/A,USA,15.00,No
+2024-11-05,11:30:00,CALL,Call to USA number,22 mins,USA,24.00,No
+2024-11-05,16:20:00,CALL,Call to UK mobile,5 mins,USA,5.00,No
+2024-11-06,10:00:00,DATA,Data usage 1GB,N/A,USA,25.00,No
+2024-11-08,13:45:00,CALL,Call to India,30 mins,UK,45.28,No
+2024-11-10,19:00:00,SERVICE,Premium SMS service,N/A,UK,22.00,No
+2024-11-01,00:00:00,PLAN,Monthly plan charge,N/A,UK,45.00,Yes""",
+    
+    # October bill with heavy roaming from multiple countries
+    "CS-BILL-202410": """date,time,type,description,duration,location,charge,included_in_plan
+2024-10-05,10:30:00,CALL,Call to UK mobile,45 mins,Australia,67.50,No
+2024-10-05,14:15:00,DATA,Data usage 2GB,N/A,Australia,50.00,No
+2024-10-08,09:00:00,CALL,Call to UK landline,20 mins,Japan,35.00,No
+2024-10-08,21:30:00,CALL,Call to local number,10 mins,Japan,15.00,No
+2024-10-10,15:45:00,DATA,Data usage 500MB,N/A,Japan,10.50,No
+2024-10-15,11:20:00,CALL,Call to Canada,15 mins,UK,32.50,No
+2024-10-20,08:00:00,DATA,Data overage 2.4GB,N/A,UK,24.00,No
+2024-10-01,00:00:00,PLAN,Monthly plan charge,N/A,UK,45.00,Yes""",
+    
+    # September bill - normal usage
+    "CS-BILL-202409": """date,time,type,description,duration,location,charge,included_in_plan
+2024-09-15,14:30:00,CALL,Call to USA,5 mins,UK,12.50,No
+2024-09-01,00:00:00,PLAN,Monthly plan charge,N/A,UK,45.00,Yes
+2024-09-05,10:00:00,CALL,UK mobile calls,250 mins,UK,0.00,Yes
+2024-09-10,15:00:00,DATA,Data usage 45GB,N/A,UK,0.00,Yes"""
+}
 
 class DummyDataStore:
     def __init__(self):
@@ -9,6 +44,25 @@ class DummyDataStore:
         self.user_name = "John Smith"
         self.phone_number = "+44 7700 900123"
         
+        # Parse every bill's line items once, up front
+        self.line_items = LineItemStore()
+        for bill_id, csv_data in BILL_LINE_ITEMS_CSV.items():
+            self.line_items.load_csv_text(csv_data, bill_id=bill_id, customer_id=self.user_id)
+        
+        # Optional real bill exports (CSV or Parquet) loaded from disk; with
+        # BILL_LINE_ITEMS_STREAMING a CSV is only indexed and read in chunks on demand
+        line_items_path = os.getenv("BILL_LINE_ITEMS_PATH")
+        if line_items_path:
+            streaming = os.getenv("BILL_LINE_ITEMS_STREAMING", "false").lower() == "true"
+            try:
+                if streaming and line_items_path.lower().endswith(".csv"):
+                    self.line_items.register_csv_source(line_items_path, customer_id=self.user_id)
+                else:
+                    self.line_items.load_file(line_items_path, customer_id=self.user_id)
+            except (OSError, ValueError, ImportError) as e:
+                # A bad export must not stop the server; the built-in demo bills still work
+                print(f"Warning: ignoring BILL_LINE_ITEMS_PATH={line_items_path}: {e}")
+        
     def get_current_plan(self) -> Dict[str, Any]:
         return {
             "plan_name": "Contoso Ultimate Entertainment",
@@ -34,41 +88,16 @@ class DummyDataStore:
         }
     
     def get_bill_line_items(self, bill_id: str) -> pd.DataFrame:
-        """Get detailed line items for a specific bill"""
-        
-        if bill_id == "CS-BILL-202411":
-            # November bill with roaming charges from USA
-            csv_data = """date,time,type,description,duration,location,charge,included_in_plan
-2024-11-03,14:23:00,CALL,Call to UK mobile,15 mins,USA,12.50,No
-2024-11-03,18:45:00,CALL,Call to UK landline,8 mins,USA,8.00,No
-2024-11-04,09:15:00,DATA,Data usage 500MB,N/A,USA,15.00,No
-2024-11-05,11:30:00,CALL,Call to USA number,22 mins,USA,24.00,No
-2024-11-05,16:20:00,CALL,Call to UK mobile,5 mins,USA,5.00,No
-2024-11-06,10:00:00,DATA,Data usage 1GB,N/A,USA,25.00,No
-2024-11-08,13:45:00,CALL,Call to India,30 mins,UK,45.28,No
-2024-11-10,19:00:00,SERVICE,Premium SMS service,N/A,UK,22.00,No
-2024-11-01,00:00:00,PLAN,Monthly plan charge,N/A,UK,45.00,Yes"""
-            
-        elif bill_id == "CS-BILL-202410":
-            # October bill with heavy roaming from multiple countries
-            csv_data = """date,time,type,description,duration,location,charge,included_in_plan
-2024-10-05,10:30:00,CALL,Call to UK mobile,45 mins,Australia,67.50,No
-2024-10-05,14:15:00,DATA,Data usage 2GB,N/A,Australia,50.00,No
-2024-10-08,09:00:00,CALL,Call to UK landline,20 mins,Japan,35.00,No
-2024-10-08,21:30:00,CALL,Call to local number,10 mins,Japan,15.00,No
-2024-10-10,15:45:00,DATA,Data usage 500MB,N/A,Japan,10.50,No
-2024-10-15,11:20:00,CALL,Call to Canada,15 mins,UK,32.50,No
-2024-10-20,08:00:00,DATA,Data overage 2.4GB,N/A,UK,24.00,No
-2024-10-01,00:00:00,PLAN,Monthly plan charge,N/A,UK,45.00,Yes"""
-            
-        else:  # September bill - normal usage
-            csv_data = """date,time,type,description,duration,location,charge,included_in_plan
-2024-09-15,14:30:00,CALL,Call to USA,5 mins,UK,12.50,No
-2024-09-01,00:00:00,PLAN,Monthly plan charge,N/A,UK,45.00,Yes
-2024-09-05,10:00:00,CALL,UK mobile calls,250 mins,UK,0.00,Yes
-2024-09-10,15:00:00,DATA,Data usage 45GB,N/A,UK,0.00,Yes"""
-        
-        return pd.read_csv(StringIO(csv_data))
+        """Get detailed line items for a specific bill (parsed once, shared read-only)"""
+        return self.line_items.get_bill(self._resolve_bill_id(bill_id))
+    
+    def _resolve_bill_id(self, bill_id: str) -> str:
+        # Unknown bills fall back to September - normal usage
+        return bill_id if self.line_items.has_bill(bill_id) else "CS-BILL-202409"
+    
+    def export_bill_line_items(self, bill_id: str, path, preview_rows: int = 10) -> Dict[str, Any]:
+        """Stream a bill's line items to a CSV file in chunks, returning counts and a preview"""
+        return self.line_items.export_csv(self._resolve_bill_id(bill_id), path, preview_rows=preview_rows)
     
     def get_recent_bills(self) -> List[Dict[str, Any]]:
         base_date = datetime.now()
@@ -234,26 +263,18 @@ class DummyDataStore:
     
     def analyze_high_charges(self, bill_id: str) -> Dict[str, Any]:
         """Analyze bill to identify main causes of high charges"""
-        df = self.get_bill_line_items(bill_id)
-        
-        # Filter out plan charges and charges included in plan
-        extra_charges = df[df['included_in_plan'] == 'No']
-        
-        # Group by type and location - create a more JSON-friendly summary
-        charge_summary = extra_charges.groupby(['type', 'location'])['charge'].agg(['sum', 'count']).reset_index()
-        charge_summary.columns = ['type', 'location', 'total_charge', 'count']
-        
-        # Find top contributors
-        top_charges = extra_charges.nlargest(3, 'charge')
-        
-        total_extra = extra_charges['charge'].sum()
-        
-        return {
-            "total_additional_charges": float(total_extra),
-            "main_contributors": charge_summary.to_dict('records'),
-            "top_3_charges": top_charges[['date', 'description', 'location', 'charge']].to_dict('records'),
-            "roaming_total": float(extra_charges[extra_charges['location'] != 'UK']['charge'].sum()),
-            "international_calls_total": float(extra_charges[(extra_charges['type'] == 'CALL') & (extra_charges['location'] == 'UK')]['charge'].sum())
-        }
+        resolved_bill_id = self._resolve_bill_id(bill_id)
+        return self.analyze_bills([resolved_bill_id])[resolved_bill_id]
+    
+    def analyze_bills(self, bill_ids: List[str] = None, top_k: int = 3) -> Dict[str, Dict[str, Any]]:
+        """Analyze several bills in one vectorized pass (all of the customer's bills by default)"""
+        if bill_ids is None:
+            bill_ids = self.line_items.bills_for_customer(self.user_id)
+        return analyze_charges(self.line_items.frame(bill_ids), group_by="bill_id", top_k=top_k)
+    
+    def analyze_customers(self, customer_ids: List[str], top_k: int = 3) -> Dict[str, Dict[str, Any]]:
+        """Analyze all bills of several customers, summarised per customer"""
+        bill_ids = [b for customer_id in customer_ids for b in self.line_items.bills_for_customer(customer_id)]
+        return analyze_charges(self.line_items.frame(bill_ids), group_by="customer_id", top_k=top_k)
 
 dummy_data = DummyDataStore()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Labelled customer utterances for the intent router
+Keys are the agent that should receive the message; "Alex" covers greetings, small talk
+and follow-ups that need context (requests spanning several specialists are detected
+by splitting them into clauses, see IntentRouter.sub_intents)
+"""
+
+INTENT_EXAMPLES = {
+    "BillingAgent": [
+        "Why is my bill so high this month?",
+        "My last bill was much higher than usual",
+        "Can you explain the charges on my November bill?",
+        "What are these roaming charges on my bill?",
+        "I was charged for an international call I don't recognise",
+        "Show me my recent bills",
+        "Break down the line items on my latest bill",
+        "Why did I pay more in November than October?",
+        "Compare my last three bills",
+        "What is this premium rate charge?",
+        "Can I get a detailed CSV of my bill?",
+        "How much did I spend on data overage?",
+        "Explain the extra fees on my statement",
+        "Why was I billed for calls to India?",
+        "Show me the trend of my monthly bills",
+        "What was the total of my September bill?",
+        "I think I've been overcharged",
+        "Which charges weren't included in my plan?",
+        "I was charged for roaming while abroad",
+    ],
+    "PlanAgent": [
+        "What roaming plans do you have for the USA?",
+        "I'm travelling to the US next month, what pass should I buy?",
+        "Which add-ons are available for my plan?",
+        "What does my current plan include?",
+        "Is roaming in Europe included in my plan?",
+        "Do I have unlimited calls and texts?",
+        "How much data do I have left this month?",
+        "Can I add more data to my plan?",
+        "Are international calls included?",
+        "What's the cheapest way to use my phone abroad?",
+        "Recommend an add-on for calling India",
+        "When does my contract end?",
+        "Show me my usage for this billing cycle",
+        "Is there a worldwide roaming pass?",
+        "Can I upgrade my plan?",
+        "Does my plan include Spotify?",
+        "What data allowance do I get?",
+        "Suggest a roaming bundle for a trip to Japan",
+    ],
+    "SupportAgent": [
+        "I want to speak to a human",
+        "Can someone call me back?",
+        "Please create a support ticket",
+        "Let me talk to a real person",
+        "I'd like to raise a complaint",
+        "Transfer me to an agent",
+        "Open a ticket about my bill dispute",
+        "I need a callback from customer service",
+        "Escalate this to a manager please",
+        "Can I speak to someone on the phone?",
+        "Log a complaint for me",
+        "I want a human to look at this",
+    ],
+    "Alex": [
+        "Hi",
+        "Hello there",
+        "Thanks, that's all",
+        "Thank you!",
+        "Yes please",
+        "No thanks",
+        "Okay",
+        "Goodbye",
+        "Can you help me?",
+        "I have a question",
+        "Tell me more",
+        "What can you do?",
+    ],
+}
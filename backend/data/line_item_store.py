@@ -0,0 +1,377 @@
+"""
+Line item store for Contoso Agent Demo
+Parses bill line items once into typed columnar frames indexed by bill and customer
+"""
+
+import csv
+import io
+import threading
+from collections import OrderedDict
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Column order of a bill's line items, as exported to CSV
+LINE_ITEM_COLUMNS = ["date", "time", "type", "description", "duration", "location", "charge", "included_in_plan"]
+
+# Parse hints so large files are read straight into compact dtypes
+CSV_DTYPES = {
+    "date": "string",
+    "time": "string",
+    "type": "category",
+    "description": "string",
+    "duration": "string",
+    "location": "category",
+    "bill_id": "string",
+    "customer_id": "string"
+}
+
+TRUE_VALUES = {"yes", "y", "true", "1"}
+
+# Rows per chunk when streaming line items from memory or disk
+EXPORT_CHUNK_ROWS = 50_000
+
+# Bills from streaming sources kept parsed in memory, least recently used dropped first
+SOURCE_CACHE_BILLS = 4
+
+
+class BillSource(NamedTuple):
+    """Where one bill's rows live in a large CSV: the header line and byte ranges of its rows"""
+    path: Path
+    header: bytes
+    ranges: List[Tuple[int, int]]
+
+
+class _RangeReader(io.RawIOBase):
+    """A CSV header followed by byte ranges of the same file, read as one stream"""
+
+    def __init__(self, source: BillSource):
+        self._file = open(source.path, "rb")
+        self._pending = source.header
+        self._ranges = iter(source.ranges)
+        self._remaining = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            if self._pending:
+                size = min(len(buffer), len(self._pending))
+                buffer[:size] = self._pending[:size]
+                self._pending = self._pending[size:]
+                return size
+            if self._remaining:
+                data = self._file.read(min(len(buffer), self._remaining))
+                if data:
+                    self._remaining -= len(data)
+                    buffer[:len(data)] = data
+                    return len(data)
+                # File shrank since it was indexed
+                self._remaining = 0
+            next_range = next(self._ranges, None)
+            if next_range is None:
+                return 0
+            start, end = next_range
+            self._file.seek(start)
+            self._remaining = end - start
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+class LineItemStore:
+    """
+    In-memory store of typed bill line items
+
+    Each bill is parsed once into a DataFrame with categorical `type`/`location`,
+    float `charge` and boolean `included_in_plan` columns. Frames returned by the
+    store are shared and must be treated as read-only.
+
+    Bills from very large CSV exports can instead be registered as streaming
+    sources: one pass over the file records the byte ranges of each bill's
+    rows, so reading a bill seeks straight to them. The few most recently
+    used source bills stay parsed in memory.
+    """
+
+    def __init__(self):
+        self._bills: Dict[str, pd.DataFrame] = {}
+        self._sources: Dict[str, BillSource] = {}
+        self._source_cache: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._bill_customers: Dict[str, str] = {}
+        self._customer_bills: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(frame: pd.DataFrame) -> pd.DataFrame:
+        """Convert raw line items into the store's typed columnar form"""
+        frame = frame.copy()
+        for column in ("type", "location"):
+            frame[column] = frame[column].astype("category")
+        frame["charge"] = pd.to_numeric(frame["charge"], errors="coerce").fillna(0.0).astype("float64")
+        if frame["included_in_plan"].dtype != bool:
+            frame["included_in_plan"] = (
+                frame["included_in_plan"].astype("string").str.strip().str.lower().isin(TRUE_VALUES)
+            ).astype(bool)
+        return frame.reset_index(drop=True)
+
+    def add_bill(self, bill_id: str, customer_id: str, frame: pd.DataFrame) -> None:
+        """Register one bill's line items, replacing any previous version"""
+        typed = self.normalize(frame[LINE_ITEM_COLUMNS])
+        with self._lock:
+            self._register(bill_id, customer_id)
+            self._bills[bill_id] = typed
+            self._sources.pop(bill_id, None)
+            self._source_cache.pop(bill_id, None)
+
+    def _register(self, bill_id: str, customer_id: str) -> None:
+        """Record bill ownership (caller holds the lock)"""
+        previous_customer = self._bill_customers.get(bill_id)
+        if previous_customer is not None and bill_id in self._customer_bills.get(previous_customer, []):
+            self._customer_bills[previous_customer].remove(bill_id)
+        self._bill_customers[bill_id] = customer_id
+        self._customer_bills.setdefault(customer_id, []).append(bill_id)
+
+    def load_csv_text(self, csv_text: str, bill_id: str, customer_id: str) -> None:
+        """Parse CSV text for a single bill"""
+        self.add_bill(bill_id, customer_id, pd.read_csv(StringIO(csv_text), dtype=CSV_DTYPES))
+
+    def load_file(self, path: Union[str, Path], bill_id: str = None, customer_id: str = None) -> List[str]:
+        """
+        Load a CSV or Parquet file of line items from disk
+
+        Files may hold many bills when they carry `bill_id` (and optionally
+        `customer_id`) columns; otherwise bill_id must be given.
+
+        Args:
+            path: .csv, .csv.gz or .parquet file
+            bill_id: Bill the rows belong to when the file has no bill_id column
+            customer_id: Owner of the bill(s) when the file has no customer_id column
+
+        Returns:
+            Bill IDs that were loaded
+
+        Raises:
+            ValueError: If the file lacks line item columns, or bill_id when none is given
+        """
+        path = Path(path)
+        if path.suffix.lower() == ".parquet":
+            # Requires pyarrow or fastparquet
+            frame = pd.read_parquet(path)
+        else:
+            frame = pd.read_csv(path, dtype=CSV_DTYPES)
+
+        missing = [column for column in LINE_ITEM_COLUMNS if column not in frame.columns]
+        if missing:
+            raise ValueError(f"{path} is missing line item columns: {', '.join(missing)}")
+        if "bill_id" not in frame.columns:
+            if not bill_id:
+                raise ValueError(f"{path} has no bill_id column; pass bill_id explicitly")
+            frame["bill_id"] = bill_id
+        if "customer_id" not in frame.columns:
+            frame["customer_id"] = customer_id or "unknown"
+
+        loaded = []
+        for (file_bill_id, file_customer_id), bill_frame in frame.groupby(["bill_id", "customer_id"], sort=False, observed=True):
+            self.add_bill(str(file_bill_id), str(file_customer_id), bill_frame)
+            loaded.append(str(file_bill_id))
+        return loaded
+
+    def register_csv_source(self, path: Union[str, Path], customer_id: str = None) -> List[str]:
+        """
+        Index the bills in a large CSV (with a bill_id column) without loading its rows
+
+        One pass over the file records the byte ranges of each bill's rows;
+        get_bill and iter_chunks then read only those ranges.
+
+        Returns:
+            Bill IDs found in the file
+
+        Raises:
+            ValueError: If the file lacks the bill_id or line item columns
+        """
+        path = Path(path)
+        with open(path, "rb") as handle:
+            header = handle.readline()
+            columns = next(csv.reader([header.decode("utf-8-sig")]), [])
+            missing = [column for column in ["bill_id"] + LINE_ITEM_COLUMNS if column not in columns]
+            if missing:
+                raise ValueError(f"{path} is missing line item columns: {', '.join(missing)}")
+            bill_column = columns.index("bill_id")
+            customer_column = columns.index("customer_id") if "customer_id" in columns else None
+
+            owners: Dict[str, str] = {}
+            ranges: Dict[str, List[Tuple[int, int]]] = {}
+            offset = len(header)
+            record_start, record, quoted = offset, b"", False
+            previous_bill = None
+            for line in handle:
+                offset += len(line)
+                record += line
+                # A quoted field may contain newlines; the record ends once quotes balance
+                quoted ^= line.count(b'"') % 2 == 1
+                if quoted:
+                    continue
+                if record.strip():
+                    if b'"' in record:
+                        fields = next(csv.reader([record.decode("utf-8")]))
+                    else:
+                        fields = record.decode("utf-8").rstrip("\r\n").split(",")
+                    bill_id = fields[bill_column]
+                    if customer_column is not None:
+                        owners.setdefault(bill_id, fields[customer_column])
+                    else:
+                        owners.setdefault(bill_id, customer_id or "unknown")
+                    bill_ranges = ranges.setdefault(bill_id, [])
+                    if bill_id == previous_bill:
+                        # Consecutive rows of one bill share a range
+                        bill_ranges[-1] = (bill_ranges[-1][0], offset)
+                    else:
+                        bill_ranges.append((record_start, offset))
+                    previous_bill = bill_id
+                record_start, record = offset, b""
+
+        with self._lock:
+            for bill_id, owner in owners.items():
+                self._register(bill_id, owner)
+                self._bills.pop(bill_id, None)
+                self._source_cache.pop(bill_id, None)
+                self._sources[bill_id] = BillSource(path, header, ranges[bill_id])
+        return list(owners)
+
+    def _read_source(self, source: BillSource, chunk_rows: int = None):
+        """Parse a source bill's rows from its byte ranges (an iterator of chunks with chunk_rows)"""
+        return pd.read_csv(io.BufferedReader(_RangeReader(source)), dtype=CSV_DTYPES, chunksize=chunk_rows)
+
+    def get_bill(self, bill_id: str) -> Optional[pd.DataFrame]:
+        """Typed line items for a bill, or None if the bill is unknown"""
+        frame = self._bills.get(bill_id)
+        if frame is not None:
+            return frame
+        source = self._sources.get(bill_id)
+        if source is None:
+            return None
+
+        with self._lock:
+            frame = self._source_cache.get(bill_id)
+            if frame is not None:
+                self._source_cache.move_to_end(bill_id)
+                return frame
+        frame = self.normalize(self._read_source(source)[LINE_ITEM_COLUMNS])
+        with self._lock:
+            self._source_cache[bill_id] = frame
+            self._source_cache.move_to_end(bill_id)
+            while len(self._source_cache) > SOURCE_CACHE_BILLS:
+                self._source_cache.popitem(last=False)
+        return frame
+
+    def has_bill(self, bill_id: str) -> bool:
+        return bill_id in self._bills or bill_id in self._sources
+
+    def iter_chunks(self, bill_id: str, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Yield a bill's typed line items in chunks of at most chunk_rows
+
+        In-memory (and cached source) bills are sliced without copying; other
+        source bills are read from their byte ranges one chunk at a time.
+        """
+        frame = self._bills.get(bill_id)
+        if frame is None:
+            with self._lock:
+                frame = self._source_cache.get(bill_id)
+        if frame is not None:
+            for start in range(0, len(frame), chunk_rows):
+                yield frame.iloc[start:start + chunk_rows]
+            return
+
+        source = self._sources.get(bill_id)
+        if source is None:
+            return
+        with self._read_source(source, chunk_rows) as reader:
+            for chunk in reader:
+                yield self.normalize(chunk[LINE_ITEM_COLUMNS])
+
+    def export_csv(self, bill_id: str, path: Union[str, Path], preview_rows: int = 10,
+                   chunk_rows: int = EXPORT_CHUNK_ROWS) -> Dict[str, Any]:
+        """
+        Stream a bill's line items to a CSV file in the customer-facing layout
+
+        The preview and totals are gathered in the same pass, so memory use is
+        bounded by chunk_rows whatever the size of the bill.
+
+        Returns:
+            row_count, total_charges (sum of positive charges), columns and preview records
+        """
+        row_count = 0
+        total_charges = 0.0
+        preview: List[Dict[str, Any]] = []
+
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            # Header up front so bills with no rows still produce a valid file
+            pd.DataFrame(columns=LINE_ITEM_COLUMNS).to_csv(handle, index=False)
+            for chunk in self.iter_chunks(bill_id, chunk_rows):
+                export = self.to_export_frame(chunk)
+                export.to_csv(handle, header=False, index=False)
+
+                row_count += len(chunk)
+                charges = chunk["charge"]
+                total_charges += float(charges[charges > 0].sum())
+                if len(preview) < preview_rows:
+                    preview.extend(export.head(preview_rows - len(preview)).to_dict("records"))
+
+        return {
+            "row_count": row_count,
+            "total_charges": round(total_charges, 2),
+            "columns": list(LINE_ITEM_COLUMNS),
+            "preview": preview
+        }
+
+    def bills_for_customer(self, customer_id: str) -> List[str]:
+        """Bill IDs owned by a customer, in load order"""
+        return list(self._customer_bills.get(customer_id, []))
+
+    def customer_for_bill(self, bill_id: str) -> Optional[str]:
+        return self._bill_customers.get(bill_id)
+
+    def frame(self, bill_ids: Iterable[str] = None) -> pd.DataFrame:
+        """
+        Line items for several bills as one frame with bill_id and customer_id columns
+
+        Args:
+            bill_ids: Bills to include (all bills when omitted); unknown IDs are skipped
+        """
+        if bill_ids is None:
+            bill_ids = list(self._bills) + list(self._sources)
+        else:
+            bill_ids = [b for b in dict.fromkeys(bill_ids) if self.has_bill(b)]
+        if not bill_ids:
+            empty = self.normalize(pd.DataFrame({column: [] for column in LINE_ITEM_COLUMNS}))
+            return empty.assign(bill_id=pd.Categorical([]), customer_id=pd.Categorical([]))
+
+        frames = [self.get_bill(b) for b in bill_ids]
+        combined = pd.concat(frames, ignore_index=True)
+        lengths = [len(frame) for frame in frames]
+        combined["bill_id"] = pd.Categorical.from_codes(
+            np.repeat(np.arange(len(bill_ids)), lengths), categories=bill_ids
+        )
+        customers = [self._bill_customers[b] for b in bill_ids]
+        customer_categories = list(dict.fromkeys(customers))
+        customer_codes = [customer_categories.index(c) for c in customers]
+        combined["customer_id"] = pd.Categorical.from_codes(
+            np.repeat(customer_codes, lengths), categories=customer_categories
+        )
+        # Categories differ between bills, so concat falls back to object - restore them
+        for column in ("type", "location"):
+            combined[column] = combined[column].astype("category")
+        return combined
+
+    @staticmethod
+    def to_export_frame(frame: pd.DataFrame) -> pd.DataFrame:
+        """Line items in the customer-facing CSV layout (included_in_plan as Yes/No)"""
+        export = frame[LINE_ITEM_COLUMNS].copy()
+        export["included_in_plan"] = export["included_in_plan"].map({True: "Yes", False: "No"})
+        return export
@@ -1,66 +1,35 @@
 import asyncio
-import os
 from dotenv import load_dotenv
 
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from semantic_kernel.agents import HandoffOrchestration, OrchestrationHandoffs
+# Load environment variables before the shared service reads its settings
+load_dotenv()
+
+from semantic_kernel.agents import HandoffOrchestration
 from semantic_kernel.agents.runtime import InProcessRuntime
 from semantic_kernel.contents import ChatMessageContent, AuthorRole
 
-from agents import create_contoso_agents
-
-# Load environment variables
-load_dotenv()
+from agents import create_contoso_agents, create_contoso_handoffs
+from utils.chart_cache import chart_cache
+from utils.file_manager import file_manager
+from utils.history_manager import history_manager
+from utils.service_factory import chat_service_factory, get_chat_service
+from utils.session_state import SessionState
 
 class ContosoHandoffDemo:
     def __init__(self):
-        # Create Azure OpenAI service
-        self.service = AzureChatCompletion(
-            deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
-            endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
-        )
+        # Index artifacts already on disk so earlier exports can be served again
+        file_manager.start()
+        chart_cache.start()
+        
+        # Shared Azure OpenAI service with a pooled, keep-alive HTTP client
+        self.service = get_chat_service()
         
         # Create agents using factory
         self.triage_agent, self.billing_agent, self.plan_agent, self.support_agent = create_contoso_agents(self.service)
         
         # Define handoff relationships following the documentation pattern
-        self.handoffs = (
-            OrchestrationHandoffs()
-            .add_many(
-                source_agent=self.triage_agent.name,
-                target_agents={
-                    self.billing_agent.name: "Transfer to this agent if the customer has billing issues, high bills, or wants bill analysis",
-                    self.plan_agent.name: "Transfer to this agent if the customer asks about roaming plans, addons, or current plan details", 
-                    self.support_agent.name: "Transfer to this agent if the customer wants to speak to a human or needs ticket creation"
-                }
-            )
-            .add(
-                source_agent=self.billing_agent.name,
-                target_agent=self.triage_agent.name,
-                description="Transfer back to triage agent after completing billing analysis"
-            )
-            .add(
-                source_agent=self.billing_agent.name,
-                target_agent=self.support_agent.name,
-                description="Transfer to support agent if billing issue cannot be resolved with available data"
-            )
-            .add(
-                source_agent=self.plan_agent.name,
-                target_agent=self.triage_agent.name,
-                description="Transfer back to triage agent after providing plan information"
-            )
-            .add(
-                source_agent=self.plan_agent.name,
-                target_agent=self.support_agent.name,
-                description="Transfer to support agent if plan issue cannot be resolved with available information"
-            )
-            .add(
-                source_agent=self.support_agent.name,
-                target_agent=self.triage_agent.name,
-                description="Transfer back to triage agent after creating support ticket"
-            )
+        self.handoffs = create_contoso_handoffs(
+            self.triage_agent, self.billing_agent, self.plan_agent, self.support_agent
         )
         
         # Create handoff orchestration
@@ -81,6 +50,9 @@ class ContosoHandoffDemo:
         
         # Create runtime
         self.runtime = InProcessRuntime()
+        
+        # Conversation so far, sent (windowed and summarised) with each turn
+        self.state = SessionState("terminal-demo")
     
     def agent_response_callback(self, message: ChatMessageContent) -> None:
         """Callback to handle agent responses"""
@@ -110,6 +82,7 @@ class ContosoHandoffDemo:
             print(f"🔧 [{message.name} is working{tool_guess}...]")
         else:
             print(f"{message.name}: {message.content}")
+            self.state.add_agent_message(message)
     
     
     async def run_demo(self):
@@ -143,14 +116,16 @@ class ContosoHandoffDemo:
                     break
                 
                 # Process user message through orchestration
+                self.state.add_user_message(user_input)
                 try:
                     orchestration_result = await self.orchestration.invoke(
-                        task=user_input,
+                        task=history_manager.build_task(self.state, self.triage_agent.name),
                         runtime=self.runtime
                     )
                     
                     # Wait for completion
                     await orchestration_result.get()
+                    history_manager.schedule_summary(self.state)
                     
                 except Exception as e:
                     print(f"\n❌ Error processing message: {str(e)}")
@@ -160,7 +135,9 @@ class ContosoHandoffDemo:
         
         finally:
             # Stop the runtime
+            history_manager.forget(self.state.session_id)
             await self.runtime.stop_when_idle()
+            await chat_service_factory.aclose()
 
 async def main():
     """Main entry point"""
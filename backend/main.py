@@ -1,31 +1,68 @@
 import asyncio
 import json
 import os
+import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any, List
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 import uvicorn
-
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from semantic_kernel.agents import HandoffOrchestration, OrchestrationHandoffs
-from semantic_kernel.agents.runtime import InProcessRuntime
-from semantic_kernel.contents import ChatMessageContent, AuthorRole
-from agents import create_contoso_agents
-from utils.file_manager import FileManager
-from utils.widget_manager import widget_manager
 from dotenv import load_dotenv
 import re
 
-# Load environment variables
+# Load environment variables before the shared pools read their settings
 load_dotenv()
 
+from semantic_kernel.contents import ChatMessageContent, AuthorRole, StreamingChatMessageContent
+from utils.agent_pool import agent_pool
+from utils.artifact_evictor import artifact_evictor
+from utils.artifact_response import artifact_response
+from utils.artifact_variants import artifact_variants
+from utils.artifact_workers import artifact_workers
+from utils.chart_cache import chart_cache
+from utils.file_manager import file_manager
+from utils.history_manager import history_manager
+from utils.intent_router import intent_router
+from utils.outbound_queue import OutboundQueue
+from utils.runtime_manager import runtime_manager
+from utils.service_factory import chat_service_factory
+from utils.session_state import SessionState
+from utils.specialist_fan_out import specialist_fan_out
+from utils.tool_cache import tool_cache
+from utils.tool_executor import tool_executor
+from utils.tool_output import tool_output
+from utils.tool_trace import tool_trace
+from utils.stream_assembler import MarkerSafeStream
+from utils.widget_manager import widget_manager
+
 # Debug mode from environment
 DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
 
-app = FastAPI(title="Contoso Agent Demo API")
+# Maximum time one customer turn may run through the orchestration
+TURN_TIMEOUT_SECONDS = float(os.getenv("TURN_TIMEOUT_SECONDS", "60"))
+# Remove a session's own artifacts (not shared charts) once it has been disconnected for a grace period
+ARTIFACT_DELETE_ON_DISCONNECT = os.getenv("ARTIFACT_DELETE_ON_DISCONNECT", "false").lower() == "true"
+ARTIFACT_DELETE_GRACE_SECONDS = float(os.getenv("ARTIFACT_DELETE_GRACE_SECONDS", "900"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the shared chat service and agent pool once per process"""
+    file_manager.start()
+    chart_cache.start()
+    await agent_pool.start(chat_service_factory)
+    runtime_manager.start()
+    artifact_workers.start()
+    artifact_evictor.start()
+    yield
+    await artifact_evictor.stop()
+    await runtime_manager.stop()
+    await chat_service_factory.aclose()
+    tool_executor.shutdown(wait=False)
+    artifact_workers.shutdown(wait=False)
+
+app = FastAPI(title="Contoso Agent Demo API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -38,86 +75,36 @@ app.add_middleware(
 
 # Global variables
 active_sessions: Dict[str, Dict] = {}
-# Use current working directory artifacts (where tools are creating files)
-file_manager = FileManager(artifacts_dir="artifacts")
+# Artifact deletions waiting out the grace period, cancelled when the session reconnects
+pending_artifact_deletions: Dict[str, asyncio.Task] = {}
+
+async def delete_session_artifacts_later(session_id: str) -> None:
+    """Delete a disconnected session's artifacts unless it reconnects within the grace period"""
+    try:
+        await asyncio.sleep(ARTIFACT_DELETE_GRACE_SECONDS)
+        if session_id not in active_sessions:
+            removed = await asyncio.to_thread(file_manager.delete_session_artifacts, session_id)
+            print(f"🧹 Deleted {removed} artifacts of disconnected session {session_id}")
+    finally:
+        if pending_artifact_deletions.get(session_id) is asyncio.current_task():
+            del pending_artifact_deletions[session_id]
 
 class ContosoWebSocketHandler:
     def __init__(self, websocket: WebSocket, session_id: str):
         self.websocket = websocket
         self.session_id = session_id
-        self.service = None
-        self.agents = None
-        self.orchestration = None
-        self.runtime = None
+        self.state = SessionState(session_id)
+        self.outbound = OutboundQueue(websocket)
+        self.turn_task: Optional[asyncio.Task] = None
+        # Open token streams per agent, and the last reply each one streamed
+        self.streams: Dict[str, MarkerSafeStream] = {}
+        self.streamed_replies: Dict[str, str] = {}
         
     async def initialize_agents(self):
-        """Initialize the agent system with WebSocket-compatible setup"""
+        """Prepare the session - agents and orchestrations come from the shared pool"""
         try:
-            # Create Azure OpenAI service (same as handoff_demo.py)
-            self.service = AzureChatCompletion(
-                deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
-                endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-                api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
-            )
-            
-            # Create agents using factory (same as handoff_demo.py)
-            triage_agent, billing_agent, plan_agent, support_agent = create_contoso_agents(self.service)
-            self.agents = {
-                'triage': triage_agent,
-                'billing': billing_agent,
-                'plan': plan_agent,
-                'support': support_agent
-            }
-            
-            # Define handoff relationships (exact same as handoff_demo.py)
-            handoffs = (
-                OrchestrationHandoffs()
-                .add_many(
-                    source_agent=triage_agent.name,
-                    target_agents={
-                        billing_agent.name: "Transfer to this agent if the customer has billing issues, high bills, or wants bill analysis",
-                        plan_agent.name: "Transfer to this agent if the customer asks about roaming plans, addons, or current plan details", 
-                        support_agent.name: "Transfer to this agent if the customer wants to speak to a human or needs ticket creation"
-                    }
-                )
-                .add(
-                    source_agent=billing_agent.name,
-                    target_agent=triage_agent.name,
-                    description="Transfer back to triage agent after completing billing analysis"
-                )
-                .add(
-                    source_agent=billing_agent.name,
-                    target_agent=support_agent.name,
-                    description="Transfer to support agent if billing issue cannot be resolved with available data"
-                )
-                .add(
-                    source_agent=plan_agent.name,
-                    target_agent=triage_agent.name,
-                    description="Transfer back to triage agent after providing plan information"
-                )
-                .add(
-                    source_agent=plan_agent.name,
-                    target_agent=support_agent.name,
-                    description="Transfer to support agent if plan issue cannot be resolved with available information"
-                )
-                .add(
-                    source_agent=support_agent.name,
-                    target_agent=triage_agent.name,
-                    description="Transfer back to triage agent after creating support ticket"
-                )
-            )
-            
-            # Create handoff orchestration with WebSocket callback
-            self.orchestration = HandoffOrchestration(
-                members=[triage_agent, billing_agent, plan_agent, support_agent],
-                handoffs=handoffs,
-                agent_response_callback=self.agent_response_callback
-            )
-            
-            # Create runtime
-            self.runtime = InProcessRuntime()
-            self.runtime.start()
+            # Pin this session to one of the shared runtimes
+            runtime_manager.attach(self.session_id)
             
             await self.send_message({
                 "type": "system",
@@ -130,11 +117,16 @@ class ContosoWebSocketHandler:
                 "content": f"Failed to initialize agents: {str(e)}"
             })
             
-    def agent_response_callback(self, message: ChatMessageContent) -> None:
+    async def agent_response_callback(self, message: ChatMessageContent) -> None:
         """WebSocket-compatible agent response callback"""
-        # Send message to WebSocket asynchronously
-        asyncio.create_task(self.handle_agent_message(message))
+        self.log_agent_message(message)
         
+        # Awaited rather than spawned so frames keep their order and a slow
+        # client applies backpressure through the bounded outbound queue
+        await self.handle_agent_message(message)
+    
+    def log_agent_message(self, message: ChatMessageContent) -> None:
+        """Print agent activity to the console"""
         # DEBUG MODE: Print full raw message as JSON
         if DEBUG_MODE:
             try:
@@ -171,6 +163,59 @@ class ContosoWebSocketHandler:
         else:
             print(f"{message.name}: {message.content}")
     
+    async def streaming_response_callback(self, message: StreamingChatMessageContent, is_final: bool) -> None:
+        """Send token chunks as agent_message_delta frames, then a final agent_message"""
+        try:
+            agent = message.name or "Alex"
+            stream = self.streams.get(agent)
+            if stream is None:
+                stream = MarkerSafeStream(stream_id=f"{agent}-{uuid.uuid4().hex[:8]}", agent=agent)
+                self.streams[agent] = stream
+            
+            delta = stream.feed(message.content or "")
+            if is_final:
+                delta += stream.finish()
+            
+            if delta:
+                await self.send_message({
+                    "type": "agent_message_delta",
+                    "agent": agent,
+                    "stream_id": stream.stream_id,
+                    "content": delta
+                })
+            
+            if is_final:
+                del self.streams[agent]
+                await self.finish_agent_stream(stream)
+                
+        except Exception as e:
+            print(f"Error handling streamed message: {e}")
+    
+    async def finish_agent_stream(self, stream: MarkerSafeStream) -> None:
+        """Send the complete streamed reply with its extracted files and widgets"""
+        content = stream.content
+        if not content.strip():
+            # Tool-call only turn, nothing was shown to the customer
+            return
+        
+        # Markers are extracted from the full text, so chunk boundaries don't matter
+        files = self.extract_file_references(content)
+        widgets = self.extract_widget_references(content)
+        
+        self.state.add_agent_message(
+            ChatMessageContent(role=AuthorRole.ASSISTANT, name=stream.agent, content=content)
+        )
+        self.streamed_replies[stream.agent] = content
+        
+        await self.send_message({
+            "type": "agent_message",
+            "agent": stream.agent,
+            "stream_id": stream.stream_id,
+            "content": content,
+            "files": files,
+            "widgets": widgets
+        })
+    
     def human_response_function(self) -> ChatMessageContent:
         """This should not be called in WebSocket mode"""
         print("Warning: human_response_function called in WebSocket mode")
@@ -201,6 +246,11 @@ class ContosoWebSocketHandler:
                         })
                         return
             
+            # Skip replies that were already delivered as a token stream
+            if message.content and self.streamed_replies.get(message.name) == message.content:
+                del self.streamed_replies[message.name]
+                return
+            
             # Handle regular agent responses
             if message.content and message.content.strip():
                 # Extract file references
@@ -209,6 +259,9 @@ class ContosoWebSocketHandler:
                 # Extract widget references
                 widgets = self.extract_widget_references(message.content)
                 
+                # Keep the reply in this session's conversation state
+                self.state.add_agent_message(message)
+                
                 await self.send_message({
                     "type": "agent_message",
                     "agent": message.name or "Alex",
@@ -236,12 +289,40 @@ class ContosoWebSocketHandler:
             print(f"Error handling agent message: {e}")
             
     async def send_message(self, message: Dict[str, Any]):
-        """Send message to WebSocket client"""
-        try:
-            await self.websocket.send_text(json.dumps(message))
-        except Exception as e:
-            print(f"Error sending message: {e}")
+        """Queue message for the WebSocket client; the session's writer sends frames in order"""
+        await self.outbound.put(message)
+    
+    def send_control(self, message: Dict[str, Any]):
+        """Queue a reply from the receive loop without waiting on a slow client"""
+        self.outbound.put_control(message)
             
+    async def start_turn(self, user_message: str):
+        """Run a turn in the background so the receive loop keeps reading; a new message supersedes the old turn"""
+        await self.cancel_turn()
+        self.turn_task = asyncio.create_task(self.process_user_message(user_message))
+    
+    async def cancel_turn(self, notify: bool = False):
+        """Abort the in-flight turn, if any"""
+        task = self.turn_task
+        self.turn_task = None
+        if task is None or task.done():
+            return
+        
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        
+        # Partially streamed replies from the aborted turn are never finished
+        self.streams.clear()
+        
+        if notify:
+            self.send_control({
+                "type": "turn_cancelled",
+                "content": "Request cancelled."
+            })
+    
     async def process_user_message(self, user_message: str):
         """Process user message through agent system"""
         try:
@@ -250,16 +331,47 @@ class ContosoWebSocketHandler:
                 "content": user_message
             })
             
+            self.state.add_user_message(user_message)
+            
+            # Clear single-intent messages skip the triage LLM hop and go straight to a specialist
+            routed_agent = intent_router.route(user_message)
+            if routed_agent:
+                print(f"🧭 Routing directly to {routed_agent}")
+            # Independent requests for several specialists are answered concurrently
+            fan_out_plan = [] if routed_agent else specialist_fan_out.plan(user_message)
+            
             try:
-                # Invoke the orchestration with the user message directly
-                # This follows the same pattern as handoff_demo.py but adapted for WebSocket
-                orchestration_result = await self.orchestration.invoke(
-                    task=user_message,
-                    runtime=self.runtime
-                )
+                # Borrow a pre-built orchestration and the shared runtime for this turn only
+                async with agent_pool.lease(self.agent_response_callback, self.streaming_response_callback, self.session_id) as pooled, \
+                        runtime_manager.turn(self.session_id) as runtime:
+                    if fan_out_plan:
+                        print(f"🔀 Fanning out to {', '.join(agent for agent, _ in fan_out_plan)}")
+                        reply = await asyncio.wait_for(
+                            specialist_fan_out.run(
+                                {agent.name: agent for agent in pooled.agents.values()},
+                                fan_out_plan,
+                                history_manager.build_task(self.state, pooled.agents['triage'].name),
+                                on_intermediate_message=self.agent_response_callback,
+                                name=pooled.agents['triage'].name
+                            ),
+                            timeout=TURN_TIMEOUT_SECONDS
+                        )
+                        await self.agent_response_callback(reply)
+                    else:
+                        # Recent messages plus a running summary, within the entry agent's token budget
+                        entry_agent = routed_agent or pooled.agents['triage'].name
+                        orchestration_result = await pooled.orchestration_for(entry_agent).invoke(
+                            task=history_manager.build_task(self.state, entry_agent),
+                            runtime=runtime
+                        )
+                        runtime_manager.track(self.session_id, orchestration_result)
+                        
+                        # Wait for completion (but don't block indefinitely). A timeout or
+                        # cancellation unwinds the lease, which stops the turn's agents
+                        await asyncio.wait_for(orchestration_result.get(), timeout=TURN_TIMEOUT_SECONDS)
                 
-                # Wait for completion (but don't block indefinitely)
-                await asyncio.wait_for(orchestration_result.get(), timeout=60.0)
+                # Fold older turns into the summary while the customer reads the reply
+                history_manager.schedule_summary(self.state)
                 
             except asyncio.TimeoutError:
                 await self.send_message({
@@ -305,12 +417,19 @@ class ContosoWebSocketHandler:
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await websocket.accept()
     
+    # A reconnecting session keeps its earlier files
+    pending_deletion = pending_artifact_deletions.pop(session_id, None)
+    if pending_deletion is not None:
+        pending_deletion.cancel()
+    
     handler = ContosoWebSocketHandler(websocket, session_id)
     active_sessions[session_id] = {
         "handler": handler,
         "websocket": websocket
     }
     
+    handler.outbound.start()
+    
     try:
         await handler.initialize_agents()
         
@@ -319,37 +438,47 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             data = await websocket.receive_text()
             message_data = json.loads(data)
             
-            if message_data.get("type") == "chat_message":
-                await handler.process_user_message(message_data.get("content", ""))
+            message_type = message_data.get("type")
+            if message_type == "chat_message":
+                await handler.start_turn(message_data.get("content", ""))
+            elif message_type == "cancel":
+                await handler.cancel_turn(notify=True)
+            elif message_type == "ping":
+                handler.send_control({"type": "pong"})
                 
     except WebSocketDisconnect:
-        if session_id in active_sessions:
-            del active_sessions[session_id]
+        pass
     except Exception as e:
         print(f"WebSocket error: {e}")
+    finally:
+        # Cancel in-flight orchestrations and unpin the session from its runtime
+        await handler.cancel_turn()
+        await runtime_manager.release(session_id)
+        history_manager.forget(session_id)
+        await handler.outbound.close(drain=False)
         if session_id in active_sessions:
             del active_sessions[session_id]
+        if ARTIFACT_DELETE_ON_DISCONNECT and session_id not in pending_artifact_deletions:
+            pending_artifact_deletions[session_id] = asyncio.create_task(delete_session_artifacts_later(session_id))
 
 @app.get("/files/{file_id}")
-async def get_file(file_id: str):
-    """Serve generated files"""
-    try:
-        file_path = file_manager.get_artifact_path(file_id)
-        print(f"DEBUG: Serving file - file_id: {file_id}, file_path: {file_path}")
-        
-        if file_path and file_path.exists():
-            print(f"DEBUG: File exists, serving: {file_path}")
-            return FileResponse(
-                path=str(file_path),
-                filename=file_id,
-                media_type='application/octet-stream'
-            )
-        else:
-            print(f"DEBUG: File not found: {file_path}")
-            raise HTTPException(status_code=404, detail="File not found")
-    except Exception as e:
-        print(f"DEBUG: Error serving file: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_file(file_id: str, request: Request, size: Optional[str] = None, w: Optional[int] = None):
+    """Serve generated files with caching headers, range support and resized/compressed variants"""
+    file_path = file_manager.get_file_path(file_id)
+    file_info = file_manager.get_file_info(file_id) if file_path else None
+    if not file_info:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    file_manager.record_access(file_id)
+    variant_path, variant, variant_headers = await artifact_variants.resolve(
+        file_path,
+        file_info["mime_type"],
+        width=w,
+        size=size,
+        accept_encoding=request.headers.get("accept-encoding", ""),
+        ranged="range" in request.headers
+    )
+    return artifact_response(request, file_id, variant_path, file_info, variant, variant_headers)
 
 @app.get("/files/{file_id}/info")
 async def get_file_info(file_id: str):
@@ -366,7 +495,45 @@ async def get_file_info(file_id: str):
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "active_sessions": len(active_sessions)}
+    return {
+        "status": "healthy",
+        "active_sessions": len(active_sessions),
+        "agent_pool": agent_pool.stats(),
+        "runtime_queue_depth": runtime_manager.queue_depth()
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """Runtime and pool metrics for capacity tuning"""
+    return {
+        "active_sessions": len(active_sessions),
+        "agent_pool": agent_pool.stats(),
+        "runtimes": runtime_manager.stats(),
+        "http_client": chat_service_factory.stats(),
+        "tool_cache": tool_cache.stats(),
+        "tool_output": tool_output.stats(),
+        "history": history_manager.stats(),
+        "intent_router": intent_router.stats(),
+        "fan_out": specialist_fan_out.stats(),
+        "tool_trace": tool_trace.stats(),
+        "chart_cache": chart_cache.stats(),
+        "tool_executor": tool_executor.stats(),
+        "artifact_workers": artifact_workers.stats(),
+        "artifact_eviction": artifact_evictor.stats(),
+        "artifact_variants": artifact_variants.stats(),
+        "outbound_queues": {
+            session_id: session["handler"].outbound.stats()
+            for session_id, session in active_sessions.items()
+        }
+    }
+
+@app.get("/debug/tool-trace")
+async def get_tool_trace(session_id: Optional[str] = None, agent: Optional[str] = None, limit: int = 100):
+    """Timing of recent tool calls (queue wait, run time, overlap), newest first"""
+    return {
+        "limits": {"default": tool_trace.default_limit, **tool_trace.limits},
+        "calls": tool_trace.entries(session_id=session_id, agent=agent, limit=limit)
+    }
 
 @app.get("/demo-architecture")
 async def get_demo_architecture():
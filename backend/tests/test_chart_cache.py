@@ -0,0 +1,76 @@
+"""
+Chart cache start-up tests
+Starts from an artifacts directory left by an earlier run and checks the cached charts are adopted
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.chart_cache import ChartCache
+from utils.file_manager import FileManager
+
+CHART_IDS = [f"monthly_bill_trend_{digit * 16}.png" for digit in "abc"]
+
+
+@pytest.fixture
+def artifacts_dir(tmp_path):
+    """Artifacts from a previous run: three cached charts, oldest first, and a CSV export"""
+    previous = FileManager(str(tmp_path))
+    for age, file_id in enumerate(reversed(CHART_IDS)):
+        path = previous.get_artifact_path(file_id)
+        path.write_bytes(b"x" * 100)
+        mtime = 1_700_000_000 - age * 60
+        os.utime(path, (mtime, mtime))
+    previous.get_artifact_path("bill_details_20240101_000000_abcd1234.csv", "session-1").write_text("a,b\n")
+    return tmp_path
+
+
+def test_start_adopts_charts_from_previous_run(artifacts_dir):
+    files = FileManager(str(artifacts_dir))
+    cache = ChartCache(files=files, max_entries=10)
+    files.start()
+    assert cache.stats()["entries"] == 0
+
+    cache.start()
+    cache.start()
+
+    stats = cache.stats()
+    assert stats["entries"] == len(CHART_IDS)
+    assert stats["bytes"] == 100 * len(CHART_IDS)
+
+
+def test_start_applies_limits_to_adopted_charts(artifacts_dir):
+    files = FileManager(str(artifacts_dir))
+    cache = ChartCache(files=files, max_entries=2)
+    files.start()
+    cache.start()
+
+    # The oldest chart is evicted from disk and index; the CSV export is not a cache entry
+    assert cache.stats()["entries"] == 2
+    assert cache.evictions == 1
+    assert files.get_file_path(CHART_IDS[0]) is None
+    assert all(files.get_file_path(file_id) for file_id in CHART_IDS[1:])
+    assert len(files.index) == 3
+
+
+def test_adopted_chart_is_a_hit(artifacts_dir):
+    files = FileManager(str(artifacts_dir))
+    cache = ChartCache(files=files, max_entries=10)
+    files.start()
+    cache.start()
+
+    async def render(path: Path) -> None:
+        raise AssertionError("a cached chart must not be re-rendered")
+
+    base_name, digest = CHART_IDS[-1].rsplit(".", 1)[0].rsplit("_", 1)
+    cache.make_key = lambda inputs: digest
+    file_id = asyncio.run(cache.get_or_render(base_name, "png", {}, render))
+
+    assert file_id == CHART_IDS[-1]
+    assert cache.hits == 1
@@ -0,0 +1,87 @@
+"""
+Connection reuse tests for the shared chat service
+Runs completions against the local stub server and checks they share one client and its pooled connections
+"""
+
+import asyncio
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from semantic_kernel.connectors.ai.open_ai import AzureChatPromptExecutionSettings
+from semantic_kernel.contents import ChatHistory
+
+from benchmarks.stub_openai_server import run_stub_server, state
+from utils.service_factory import ChatServiceFactory
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def stub_endpoint(monkeypatch):
+    with run_stub_server(port=_free_port()) as base_url:
+        monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", base_url)
+        monkeypatch.setenv("AZURE_OPENAI_API_KEY", "stub")
+        monkeypatch.setenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", "stub-deployment")
+        # The stub is plain HTTP/1.1
+        monkeypatch.setenv("AZURE_OPENAI_HTTP2", "false")
+        state.reset()
+        yield base_url
+
+
+async def _complete(factory: ChatServiceFactory, text: str) -> str:
+    history = ChatHistory()
+    history.add_user_message(text)
+    response = await factory.get_service().get_chat_message_content(history, AzureChatPromptExecutionSettings())
+    return response.content
+
+
+def test_sequential_calls_share_one_client_and_connection(stub_endpoint):
+    factory = ChatServiceFactory()
+
+    async def run():
+        service = factory.get_service()
+        http_client = factory._http_client
+        replies = [await _complete(factory, f"ping {index}") for index in range(5)]
+        assert factory.get_service() is service
+        assert factory._http_client is http_client
+        assert service.client._client is http_client
+        await factory.aclose()
+        return replies
+
+    replies = asyncio.run(run())
+
+    assert replies == [f"Stub reply to: ping {index}" for index in range(5)]
+    assert len(state.requests) == 5
+    assert len(state.connections) == 1
+
+
+def test_concurrent_calls_reuse_pooled_connections(stub_endpoint):
+    factory = ChatServiceFactory()
+    concurrency = 4
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(index: int) -> str:
+            async with semaphore:
+                return await _complete(factory, f"ping {index}")
+
+        # Two rounds, so the second finds keep-alive connections left by the first
+        await asyncio.gather(*(one(index) for index in range(20)))
+        await asyncio.gather(*(one(index) for index in range(20)))
+        await factory.aclose()
+
+    asyncio.run(run())
+
+    assert len(state.requests) == 40
+    assert len(state.connections) <= concurrency
+    assert factory.stats()["client_open"] is False
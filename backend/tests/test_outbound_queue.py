@@ -0,0 +1,66 @@
+"""
+Outbound queue tests
+Checks control replies get past a full queue under the block policy without reordering frames
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.outbound_queue import OutboundQueue
+
+
+class SlowWebSocket:
+    """Records sent frames; each send waits until the test lets it through"""
+
+    def __init__(self):
+        self.sent = []
+        self.gate = asyncio.Event()
+
+    async def send_text(self, text: str) -> None:
+        await self.gate.wait()
+        self.sent.append(json.loads(text)["type"])
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def test_control_frames_do_not_wait_for_a_slow_client():
+    async def scenario():
+        websocket = SlowWebSocket()
+        queue = OutboundQueue(websocket, maxsize=2, policy="block")
+        queue.start()
+        await queue.put({"type": "chunk0"})
+        await queue.put({"type": "chunk1"})
+        # chunk0 is being sent and chunk1 is queued, so the queue is full
+        blocked = asyncio.create_task(queue.put({"type": "chunk2"}))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        queue.put_control({"type": "pong"})
+
+        websocket.gate.set()
+        await blocked
+        await queue.close()
+        return websocket.sent
+
+    assert asyncio.run(scenario()) == ["chunk0", "chunk1", "pong", "chunk2"]
+
+
+def test_close_releases_blocked_producers():
+    async def scenario():
+        queue = OutboundQueue(SlowWebSocket(), maxsize=1, policy="block")
+        queue.start()
+        # chunk0 holds the only slot while it is being sent
+        await queue.put({"type": "chunk0"})
+        blocked = [asyncio.create_task(queue.put({"type": "late"})) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert not any(task.done() for task in blocked)
+
+        await queue.close(drain=False)
+        await asyncio.wait_for(asyncio.gather(*blocked), timeout=1)
+
+    asyncio.run(scenario())
@@ -1,24 +1,32 @@
 from typing import Annotated, Dict, Any, List
 from semantic_kernel.functions import kernel_function
 from data.dummy_data import dummy_data
+from data.charge_analytics import compare_totals
+from utils.artifact_workers import artifact_workers
+from utils.chart_renderer import chart_renderer, CONTOSO_BLUE, DARK_GREY, LIGHT_GREY
 from utils.file_manager import file_manager
-import json
+from utils.tool_cache import tool_cache
+from utils.tool_context import ToolContext
+from utils.tool_executor import tool_executor
+from utils.tool_output import tool_output
 import csv
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
 from pathlib import Path
 import pandas as pd
 
 class BillingTools:
+    def __init__(self, context: ToolContext = None):
+        # Tells the tools which session their artifacts belong to
+        self.context = context or ToolContext()
+    
     @kernel_function(
         name="get_recent_bills",
         description="Get the user's recent billing information with month-on-month chart"
     )
-    def get_recent_bills(self) -> Annotated[str, "Recent bills with totals, breakdown and chart file reference"]:
+    async def get_recent_bills(self) -> Annotated[str, "Recent bills with totals, breakdown and chart file reference"]:
         bills = dummy_data.get_recent_bills()
         
         # Create month-on-month chart
-        chart_file_id = self._create_monthly_trend_chart(bills)
+        chart_file_id = await self._create_monthly_trend_chart(bills)
         
         # Add chart reference to response
         response = {
@@ -29,9 +37,9 @@ class BillingTools:
             )
         }
         
-        return json.dumps(response, indent=2)
+        return tool_output.dumps(response, tool="get_recent_bills")
     
-    def _create_monthly_trend_chart(self, bills_data: List[Dict[str, Any]]) -> str:
+    async def _create_monthly_trend_chart(self, bills_data: List[Dict[str, Any]]) -> str:
         """Create month-on-month bill trend chart with Contoso branding"""
         
         # Extract bill amounts and dates
@@ -40,73 +48,23 @@ class BillingTools:
             return None
             
         # Prepare data for chart
-        months = []
-        amounts = []
-        for bill in bills:
-            months.append(bill["period"])  # Use period field
-            amounts.append(bill["total"])  # Use total field
-        
-        # Contoso brand colors
-        contoso_blue = "#0078D4"
-        vf_dark_grey = "#333333"
-        vf_light_grey = "#CCCCCC"
-        
-        # Create figure with Contoso styling
-        plt.style.use('default')
-        fig, ax = plt.subplots(figsize=(12, 7))
-        fig.patch.set_facecolor('white')
-        
-        # Create bar chart
-        bars = ax.bar(months, amounts, color=contoso_blue, alpha=0.8, edgecolor=vf_dark_grey, linewidth=1)
-        
-        # Customize chart
-        ax.set_title('Monthly Bill Trend', fontsize=18, fontweight='bold', color=vf_dark_grey, pad=20)
-        ax.set_xlabel('Billing Period', fontsize=12, color=vf_dark_grey)
-        ax.set_ylabel('Amount (£)', fontsize=12, color=vf_dark_grey)
-        
-        # Format y-axis to show currency
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'£{x:.0f}'))
-        
-        # Customize grid
-        ax.grid(True, linestyle='--', alpha=0.3, color=vf_light_grey)
-        ax.set_axisbelow(True)
-        
-        # Add value labels on bars
-        for bar, amount in zip(bars, amounts):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 2,
-                   f'£{amount:.0f}', ha='center', va='bottom', 
-                   fontweight='bold', color=vf_dark_grey)
-        
-        # Style the axes
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color(vf_light_grey)
-        ax.spines['bottom'].set_color(vf_light_grey)
-        ax.tick_params(colors=vf_dark_grey)
-        
-        # Rotate x-axis labels for better readability
-        plt.xticks(rotation=45, ha='right')
-        
-        # Add Contoso text branding
-        fig.text(0.95, 0.98, 'CONTOSO', 
-                fontsize=14, fontweight='bold', 
-                color=contoso_blue, alpha=0.8,
-                ha='right', va='top', 
-                transform=fig.transFigure)
-        
-        # Adjust layout to prevent label cutoff
-        plt.tight_layout()
-        
-        # Generate file ID and save chart
-        file_id = file_manager.generate_file_id("monthly_bill_trend", "png")
-        file_path = file_manager.get_artifact_path(file_id)
-        
-        # Save chart with high DPI
-        plt.savefig(file_path, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        months = [bill["period"] for bill in bills]
+        amounts = [bill["total"] for bill in bills]
+        
+        # Reuse the existing file when the same chart has been rendered before
+        # (rendered on a warm artifact worker process otherwise)
+        image_format = chart_renderer.image_format
+        file_id = await artifact_workers.create_chart(
+            "monthly_bill_trend",
+            {"chart": "monthly_trend", "months": months, "amounts": amounts, "format": image_format},
+            chart_renderer.cache_params(image_format)
+        )
+        if file_id in file_manager.index:
+            # Cache hit on a registered chart; the cache has already touched it
+            return file_id
+        file_path = file_manager.get_file_path(file_id)
         
-        # Register artifact
+        # Register artifact (shared: identical charts are reused across sessions)
         file_manager.save_artifact(
             file_id=file_id,
             file_path=file_path,
@@ -114,9 +72,10 @@ class BillingTools:
             metadata={
                 "chart_type": "bar_chart",
                 "data_points": len(bills),
-                "format": "png",
-                "dimensions": "1200x700",
-                "brand_colors": ["#0078D4", "#333333", "#CCCCCC"],
+                "format": image_format,
+                "dimensions": chart_renderer.pixel_size if image_format != "svg" else "vector",
+                "dpi": chart_renderer.dpi,
+                "brand_colors": [CONTOSO_BLUE, DARK_GREY, LIGHT_GREY],
                 "includes_logo": True
             }
         )
@@ -127,56 +86,81 @@ class BillingTools:
         name="get_bill_details",
         description="Get detailed line items for a specific bill and create CSV artifact"
     )
-    def get_bill_details(
+    async def get_bill_details(
         self,
         bill_id: Annotated[str, "The bill ID to get details for"]
     ) -> Annotated[str, "Detailed bill line items with file reference for frontend rendering"]:
-        df = dummy_data.get_bill_line_items(bill_id)
-        
-        # Create CSV artifact
+        # Stream the line items to the CSV artifact in bounded chunks (customer-facing
+        # layout, included_in_plan as Yes/No); counts and preview come from the same pass
+        session_id = self.context.session_id
         file_id = file_manager.generate_file_id(f"bill_details_{bill_id}", "csv")
-        file_path = file_manager.get_artifact_path(file_id)
-        
-        # Save CSV file
-        df.to_csv(file_path, index=False)
+        file_path = file_manager.get_artifact_path(file_id, session_id)
+        export = await tool_executor.run("io", dummy_data.export_bill_line_items, bill_id, file_path,
+                                        tool_output.preview_rows)
         
         # Register artifact with metadata
         file_manager.save_artifact(
             file_id=file_id,
             file_path=file_path,
             description=f"Detailed line items for bill {bill_id}",
+            session_id=session_id,
             metadata={
                 "bill_id": bill_id,
-                "row_count": len(df),
-                "columns": df.columns.tolist(),
-                "total_charges": df[df['charge'] > 0]['charge'].sum() if 'charge' in df.columns else 0
+                "row_count": export["row_count"],
+                "columns": export["columns"],
+                "total_charges": export["total_charges"]
             }
         )
         
         # Return structured response with file reference
         summary = {
             "bill_id": bill_id,
-            "total_line_items": len(df),
+            "total_line_items": export["row_count"],
             "file_reference": file_manager.format_file_reference(
                 file_id, 
                 f"Bill {bill_id} Line Items"
             ),
-            "preview": df.head(10).to_dict('records') if len(df) > 0 else []
+            "preview": export["preview"]
         }
         
-        return json.dumps(summary, indent=2)
+        return tool_output.dumps(summary, tool="get_bill_details")
     
     @kernel_function(
         name="analyze_high_charges",
         description="Analyze a bill to identify causes of high charges"
     )
+    @tool_cache.cached()
+    @tool_executor.offload("cpu")
     def analyze_high_charges(
         self,
         bill_id: Annotated[str, "The bill ID to analyze"]
     ) -> Annotated[str, "Analysis of high charges including main contributors"]:
         analysis = dummy_data.analyze_high_charges(bill_id)
-        return json.dumps(analysis, indent=2)
+        return tool_output.dumps(analysis, tool="analyze_high_charges")
+    
     
+    @kernel_function(
+        name="compare_bill_charges",
+        description="Analyze and compare high charges across several bills in one call"
+    )
+    @tool_cache.cached()
+    @tool_executor.offload("cpu")
+    def compare_bill_charges(
+        self,
+        bill_ids: Annotated[List[str], "The bill IDs to analyze, e.g. ['CS-BILL-202411', 'CS-BILL-202410']"]
+    ) -> Annotated[str, "Per-bill analysis of high charges plus a side-by-side comparison of totals"]:
+        known = [b for b in bill_ids if dummy_data.line_items.has_bill(b)]
+        analyses = dummy_data.analyze_bills(known)
+        
+        response = {
+            "comparison": compare_totals(analyses),
+            "bills": analyses
+        }
+        unknown = [b for b in bill_ids if b not in analyses]
+        if unknown:
+            response["unknown_bill_ids"] = unknown
+        
+        return tool_output.dumps(response, tool="compare_bill_charges")
     
     @kernel_function(
         name="calculate_bill_item",
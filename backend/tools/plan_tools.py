@@ -1,40 +1,45 @@
 from typing import Annotated, Dict, Any, List
 from semantic_kernel.functions import kernel_function
 from data.dummy_data import dummy_data
-import json
+from utils.tool_cache import tool_cache
+from utils.tool_output import tool_output
 
 class PlanTools:
     @kernel_function(
         name="get_current_plan",
         description="Get the user's current mobile plan details"
     )
+    @tool_cache.cached()
     def get_current_plan(self) -> Annotated[str, "Current plan details including features"]:
         plan = dummy_data.get_current_plan()
-        return json.dumps(plan, indent=2)
+        return tool_output.dumps(plan, tool="get_current_plan")
     
     @kernel_function(
         name="get_roaming_plans",
         description="Get available roaming plans for international travel"
     )
+    @tool_cache.cached()
     def get_roaming_plans(self) -> Annotated[str, "Available roaming plans with pricing"]:
         plans = dummy_data.get_roaming_plans()
-        return json.dumps(plans, indent=2)
+        return tool_output.dumps(plans, tool="get_roaming_plans")
     
     @kernel_function(
         name="get_available_addons",
         description="Get available add-ons to enhance the current plan"
     )
+    @tool_cache.cached()
     def get_available_addons(self) -> Annotated[str, "Available add-ons with pricing"]:
         addons = dummy_data.get_available_addons()
-        return json.dumps(addons, indent=2)
+        return tool_output.dumps(addons, tool="get_available_addons")
     
     @kernel_function(
         name="get_usage_summary",
         description="Get current billing cycle usage summary"
     )
+    @tool_cache.cached()
     def get_usage_summary(self) -> Annotated[str, "Usage summary for current billing cycle"]:
         usage = dummy_data.get_usage_summary()
-        return json.dumps(usage, indent=2)
+        return tool_output.dumps(usage, tool="get_usage_summary")
     
     @kernel_function(
         name="check_feature_inclusion",
@@ -51,25 +56,25 @@ class PlanTools:
         # Check included features
         for included in plan['included_features']:
             if feature_lower in included.lower():
-                return json.dumps({
+                return tool_output.dumps({
                     "included": True,
                     "feature": feature,
                     "details": included,
                     "additional_info": "This feature is included in your current plan"
-                })
+                }, tool="check_feature_inclusion")
         
         # Check excluded features
         for excluded in plan['excluded_features']:
             if feature_lower in excluded.lower():
-                return json.dumps({
+                return tool_output.dumps({
                     "included": False,
                     "feature": feature,
                     "details": excluded,
                     "additional_info": "This feature is NOT included in your current plan. Additional charges apply."
-                })
+                }, tool="check_feature_inclusion")
         
-        return json.dumps({
+        return tool_output.dumps({
             "included": "unknown",
             "feature": feature,
             "additional_info": "Unable to determine if this specific feature is included. Please check with customer service."
-        })
\ No newline at end of file
+        }, tool="check_feature_inclusion")
\ No newline at end of file
@@ -1,7 +1,7 @@
 from typing import Annotated, Dict, Any, List
 from semantic_kernel.functions import kernel_function
 from datetime import datetime, timedelta
-import json
+from utils.tool_output import tool_output
 import uuid
 
 class SupportTools:
@@ -39,12 +39,12 @@ class SupportTools:
         print(f"DEBUG: Added ticket to storage. Total tickets now: {len(SupportTools._shared_tickets)}")
         print(f"DEBUG: Ticket ID added: {ticket['ticket_id']}")
         
-        return json.dumps({
+        return tool_output.dumps({
             "success": True,
             "ticket_id": ticket_id,
             "message": f"Support ticket {ticket_id} has been created successfully",
             "confirmation": "A human agent will reach out to you within 24 hours"
-        }, indent=2)
+        }, tool="create_support_ticket")
     
     @kernel_function(
         name="get_widget_link",
@@ -81,19 +81,19 @@ class SupportTools:
         
         if action_type in widgets:
             widget = widgets[action_type]
-            return json.dumps({
+            return tool_output.dumps({
                 "widget_type": widget["type"],
                 "action_url": widget["url"],
                 "button_text": widget["button_text"],
                 "disclaimer": widget["disclaimer"],
                 "display_format": "button",
                 "demo_note": "This is a demo link - no actual charges will be applied"
-            }, indent=2)
+            }, tool="get_widget_link")
         else:
-            return json.dumps({
+            return tool_output.dumps({
                 "error": "Invalid action type",
                 "valid_types": list(widgets.keys())
-            }, indent=2)
+            }, tool="get_widget_link")
     
     def _calculate_callback_time(self, priority: str) -> str:
         """Calculate expected callback time based on priority"""
@@ -0,0 +1,216 @@
+"""
+Agent pool for Contoso Agent Demo
+Builds agents and handoff orchestrations once per process and leases them to sessions
+"""
+
+import asyncio
+import inspect
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from semantic_kernel.agents import HandoffOrchestration
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from semantic_kernel.contents import ChatMessageContent, StreamingChatMessageContent
+
+from agents import create_contoso_agents, create_contoso_handoffs
+from utils.service_factory import ChatServiceFactory, LeaseTransport
+from utils.tool_context import ToolContext
+
+
+class PooledOrchestration:
+    """One pre-built set of Contoso agents wired into a handoff orchestration"""
+
+    def __init__(self, service: AzureChatCompletion, transport: LeaseTransport, streaming: bool = False):
+        # Tools of this slot read the leasing session from here
+        self.context = ToolContext()
+        # Carries this slot's LLM requests; an abandoned turn aborts them through it
+        self.transport = transport
+        triage_agent, billing_agent, plan_agent, support_agent = create_contoso_agents(service, self.context)
+        self.agents = {
+            'triage': triage_agent,
+            'billing': billing_agent,
+            'plan': plan_agent,
+            'support': support_agent
+        }
+
+        # Orchestrations are built once; responses are routed to whichever
+        # session currently holds the lease. The first member receives the
+        # task, so there is one orchestration per possible entry agent: triage,
+        # or a specialist chosen up front by the intent router
+        handoffs = create_contoso_handoffs(triage_agent, billing_agent, plan_agent, support_agent)
+        members = [triage_agent, billing_agent, plan_agent, support_agent]
+        self.orchestrations: Dict[str, HandoffOrchestration] = {
+            entry.name: HandoffOrchestration(
+                members=[entry] + [member for member in members if member is not entry],
+                handoffs=handoffs,
+                agent_response_callback=self._dispatch_agent_response,
+                streaming_agent_response_callback=self._dispatch_streaming_response if streaming else None
+            )
+            for entry in members
+        }
+        self.orchestration = self.orchestrations[triage_agent.name]
+        self.streaming = streaming
+        self.listener: Optional[Callable[[ChatMessageContent], Any]] = None
+        self.streaming_listener: Optional[Callable[[StreamingChatMessageContent, bool], Any]] = None
+
+    def orchestration_for(self, agent_name: Optional[str]) -> HandoffOrchestration:
+        """Orchestration whose first agent is agent_name (triage when None or unknown)"""
+        return self.orchestrations.get(agent_name, self.orchestration)
+
+    async def abort(self, grace_seconds: float) -> bool:
+        """
+        Stop the agents of an abandoned turn
+
+        Every task that sent an LLM request during the lease is cancelled,
+        which aborts the request and releases its connection, and the slot's
+        transport refuses new requests until the next lease.
+
+        Returns:
+            True when the cancelled agents finished unwinding within grace_seconds
+        """
+        cancelled = self.transport.abort()
+        if not cancelled:
+            return True
+        _, pending = await asyncio.wait(cancelled, timeout=grace_seconds)
+        return not pending
+
+    async def _dispatch_agent_response(self, message: ChatMessageContent) -> None:
+        """Forward agent responses to the session holding the lease"""
+        listener = self.listener
+        if listener is None:
+            return
+        result = listener(message)
+        if inspect.isawaitable(result):
+            await result
+
+    async def _dispatch_streaming_response(self, message: StreamingChatMessageContent, is_final: bool) -> None:
+        """Forward streamed chunks to the session holding the lease"""
+        listener = self.streaming_listener
+        if listener is None:
+            return
+        result = listener(message, is_final)
+        if inspect.isawaitable(result):
+            await result
+
+
+class AgentPool:
+    """Process-wide pool of pre-warmed agent orchestrations"""
+
+    def __init__(self, size: int = None, warm_up: bool = None, streaming: bool = None):
+        self.size = size or int(os.getenv("AGENT_POOL_SIZE", "8"))
+        if warm_up is None:
+            warm_up = os.getenv("AGENT_POOL_WARM_UP", "true").lower() == "true"
+        self.warm_up = warm_up
+        if streaming is None:
+            streaming = os.getenv("AGENT_STREAMING", "true").lower() == "true"
+        self.streaming = streaming
+
+        self.abort_grace_seconds = float(os.getenv("AGENT_POOL_ABORT_GRACE_SECONDS", "5"))
+
+        self._factory: Optional[ChatServiceFactory] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._created = 0
+        self._leased = 0
+        self._total_wait_seconds = 0.0
+        self._total_leases = 0
+        self._aborted = 0
+        self._discarded = 0
+
+    async def start(self, factory: ChatServiceFactory) -> None:
+        """Bind the pool to the chat service factory and optionally build every slot up front"""
+        self._factory = factory
+        self._idle = asyncio.Queue()
+
+        if self.warm_up:
+            for _ in range(self.size):
+                self._idle.put_nowait(self._build())
+            print(f"🔥 Agent pool warmed up with {self.size} orchestrations")
+
+    def _build(self) -> PooledOrchestration:
+        """Create one pooled orchestration with its own lease-scoped chat service"""
+        self._created += 1
+        service, transport = self._factory.create_lease_service()
+        return PooledOrchestration(service, transport, streaming=self.streaming)
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        listener: Callable[[ChatMessageContent], Any],
+        streaming_listener: Optional[Callable[[StreamingChatMessageContent, bool], Any]] = None,
+        session_id: Optional[str] = None
+    ) -> AsyncIterator[PooledOrchestration]:
+        """
+        Borrow an orchestration for the duration of one turn
+
+        Args:
+            listener: Callback that receives agent responses while the lease is held
+            streaming_listener: Callback that receives token chunks when streaming is enabled
+            session_id: Session the turn belongs to, exposed to tools through the slot's ToolContext
+
+        Yields:
+            PooledOrchestration reserved for the caller
+        """
+        if self._idle is None:
+            raise RuntimeError("Agent pool has not been started")
+
+        started = time.perf_counter()
+        if self._idle.empty() and self._created < self.size:
+            # Lazily grow up to the configured size when warm-up is disabled
+            pooled = self._build()
+        else:
+            pooled = await self._idle.get()
+        self._total_wait_seconds += time.perf_counter() - started
+        self._total_leases += 1
+
+        self._leased += 1
+        pooled.listener = listener
+        pooled.streaming_listener = streaming_listener
+        pooled.context.session_id = session_id
+        pooled.transport.begin()
+        completed = False
+        try:
+            yield pooled
+            completed = True
+        finally:
+            pooled.listener = None
+            pooled.streaming_listener = None
+            pooled.context.session_id = None
+            self._leased -= 1
+            if completed:
+                pooled.transport.end()
+                self._idle.put_nowait(pooled)
+            else:
+                # Cancelled, timed out or failed: agents from this turn may still be
+                # running, so abort them before the slot can serve another session
+                self._aborted += 1
+                reusable = False
+                try:
+                    reusable = await pooled.abort(self.abort_grace_seconds)
+                finally:
+                    if reusable:
+                        self._idle.put_nowait(pooled)
+                    else:
+                        # Never hand out a slot whose agents may still be running;
+                        # the pool grows back lazily on a later lease
+                        self._discarded += 1
+                        self._created -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation counters"""
+        return {
+            "size": self.size,
+            "streaming": self.streaming,
+            "created": self._created,
+            "leased": self._leased,
+            "idle": self._idle.qsize() if self._idle else 0,
+            "total_leases": self._total_leases,
+            "aborted": self._aborted,
+            "discarded": self._discarded,
+            "avg_wait_ms": round(self._total_wait_seconds / self._total_leases * 1000, 2) if self._total_leases else 0.0
+        }
+
+
+# Global instance
+agent_pool = AgentPool()
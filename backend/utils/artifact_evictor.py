@@ -0,0 +1,125 @@
+"""
+Artifact evictor for Contoso Agent Demo
+Background task that keeps the artifacts directory within size and age budgets
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.file_manager import FileManager, file_manager
+
+
+class ArtifactEvictor:
+    """
+    Periodically evicts artifacts, least recently used first
+
+    A file is evicted when it has not been created, rewritten or served within
+    max_age_hours, or while the total size is above max_bytes. Candidates are
+    taken from the front of the index's last-used ordering, so a batch only
+    looks at the files it may evict. Work is done in small batches on a worker
+    thread, yielding to the event loop in between, so eviction never holds up
+    requests.
+    """
+
+    def __init__(self, files: FileManager = None, max_bytes: int = None, max_age_hours: float = None,
+                 interval_seconds: float = None, batch_size: int = None):
+        self.files = files or file_manager
+        self.max_bytes = max_bytes or int(os.getenv("ARTIFACT_MAX_TOTAL_MB", "1024")) * 1024 * 1024
+        self.max_age_hours = max_age_hours or float(os.getenv("ARTIFACT_MAX_AGE_HOURS", "24"))
+        self.interval_seconds = interval_seconds or float(os.getenv("ARTIFACT_EVICTION_INTERVAL_SECONDS", "60"))
+        self.batch_size = batch_size or int(os.getenv("ARTIFACT_EVICTION_BATCH_SIZE", "50"))
+        self.enabled = os.getenv("ARTIFACT_EVICTION_ENABLED", "true").lower() == "true"
+
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.passes = 0
+        self.files_evicted = 0
+        self.bytes_reclaimed = 0
+        self.last_pass_ms = 0.0
+
+    def start(self) -> None:
+        """Start the background eviction loop"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the eviction loop"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Artifact eviction failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> int:
+        """
+        Evict batches until the directory is within budget
+
+        Returns:
+            Number of files evicted in this pass
+        """
+        started = time.perf_counter()
+        evicted = 0
+        while True:
+            batch = await asyncio.to_thread(self._evict_batch)
+            evicted += batch
+            if batch < self.batch_size:
+                break
+            # Let requests run between batches
+            await asyncio.sleep(0)
+        self.passes += 1
+        self.last_pass_ms = round((time.perf_counter() - started) * 1000, 2)
+        return evicted
+
+    def _evict_batch(self) -> int:
+        """Evict up to batch_size files that are expired or push the total over budget"""
+        # Persist recent downloads so LRU order survives a restart
+        self.files.index.flush_used()
+        cutoff = time.time() - self.max_age_hours * 3600
+        over_budget = self.files.index.total_bytes > self.max_bytes
+        candidates: List[Dict[str, Any]] = self.files.index.least_recently_used(self.batch_size)
+
+        evicted = 0
+        for record in candidates:
+            expired = self.files.last_used(record) < cutoff
+            if not expired and not over_budget:
+                # Candidates are in LRU order, so nothing later qualifies either
+                break
+            if self.files.remove(record["file_id"]):
+                evicted += 1
+                self.files_evicted += 1
+                self.bytes_reclaimed += record.get("size_bytes", 0)
+            over_budget = self.files.index.total_bytes > self.max_bytes
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "files": len(self.files.index),
+            "total_bytes": self.files.index.total_bytes,
+            "max_bytes": self.max_bytes,
+            "max_age_hours": self.max_age_hours,
+            "passes": self.passes,
+            "files_evicted": self.files_evicted,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "last_pass_ms": self.last_pass_ms
+        }
+
+
+# Global instance
+artifact_evictor = ArtifactEvictor()
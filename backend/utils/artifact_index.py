@@ -0,0 +1,190 @@
+"""
+Artifact metadata index for Contoso Agent Demo
+In-memory registry of artifact records, ordered by creation and last use, optionally persisted to SQLite
+"""
+
+import bisect
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+
+class ArtifactIndex:
+    """
+    File ID -> metadata record map with creation- and use-ordered listings
+
+    Lookups are dictionary hits; listings walk lists kept sorted by
+    (created_ts, file_id) and by (last used, file_id), and records are grouped
+    by their session_id so a session's artifacts can be found without a scan.
+    A file's last use is the latest of its creation, rewrite (modified_ts) and
+    download (mark_used). When db_path is set every change is written through
+    to SQLite and the index is reloaded from it on start-up; downloads are
+    only written by flush_used, so serving a file does not cost a write.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._order: List[tuple] = []
+        self._last_used: Dict[str, float] = {}
+        self._lru: List[tuple] = []
+        self._unflushed: Set[str] = set()
+        self._by_session: Dict[Optional[str], Set[str]] = {}
+        self.total_bytes = 0
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if db_path:
+            self._open_db()
+
+    def _open_db(self) -> None:
+        # Tools register artifacts from worker threads, so share one guarded connection
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            " file_id TEXT PRIMARY KEY,"
+            " created_ts REAL NOT NULL,"
+            " record TEXT NOT NULL,"
+            " last_used_ts REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(artifacts)")}
+        if "last_used_ts" not in columns:
+            # Databases from before access ordering was persisted
+            self._db.execute("ALTER TABLE artifacts ADD COLUMN last_used_ts REAL")
+        for file_id, record, last_used in self._db.execute("SELECT file_id, record, last_used_ts FROM artifacts"):
+            self._put_memory(file_id, json.loads(record), last_used or 0.0)
+
+    def _put_memory(self, file_id: str, record: Dict[str, Any], last_used: float = 0.0) -> float:
+        previous = self._records.get(file_id)
+        if previous is not None:
+            last_used = max(last_used, self._last_used[file_id])
+            self._forget_memory(file_id, previous)
+        self._records[file_id] = record
+        self.total_bytes += record.get("size_bytes", 0)
+        bisect.insort(self._order, (record["created_ts"], file_id))
+        self._by_session.setdefault(record.get("session_id"), set()).add(file_id)
+        last_used = max(last_used, record["created_ts"], record.get("modified_ts", 0.0))
+        self._last_used[file_id] = last_used
+        bisect.insort(self._lru, (last_used, file_id))
+        return last_used
+
+    def _forget_memory(self, file_id: str, record: Dict[str, Any]) -> None:
+        self.total_bytes -= record.get("size_bytes", 0)
+        self._order.pop(bisect.bisect_left(self._order, (record["created_ts"], file_id)))
+        self._lru.pop(bisect.bisect_left(self._lru, (self._last_used.pop(file_id), file_id)))
+        session_files = self._by_session.get(record.get("session_id"))
+        if session_files is not None:
+            session_files.discard(file_id)
+            if not session_files:
+                del self._by_session[record.get("session_id")]
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """Add or replace a record (must contain file_id and created_ts)"""
+        file_id = record["file_id"]
+        with self._lock:
+            last_used = self._put_memory(file_id, record)
+            self._unflushed.discard(file_id)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO artifacts (file_id, created_ts, record, last_used_ts) VALUES (?, ?, ?, ?)",
+                    (file_id, record["created_ts"], json.dumps(record, default=str), last_used)
+                )
+
+    def update(self, file_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Change fields of an existing record, returning it (or None if unknown)"""
+        with self._lock:
+            record = self._records.get(file_id)
+            if record is None:
+                return None
+            self.put({**record, **fields})
+            return self._records[file_id]
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(file_id)
+
+    def mark_used(self, file_id: str, timestamp: float) -> None:
+        """Record a download, moving the file to the most recently used end"""
+        with self._lock:
+            previous = self._last_used.get(file_id)
+            if previous is None or timestamp <= previous:
+                return
+            self._lru.pop(bisect.bisect_left(self._lru, (previous, file_id)))
+            self._last_used[file_id] = timestamp
+            bisect.insort(self._lru, (timestamp, file_id))
+            self._unflushed.add(file_id)
+
+    def flush_used(self) -> int:
+        """Write downloads recorded since the last flush to SQLite, returning how many"""
+        with self._lock:
+            if self._db is None or not self._unflushed:
+                self._unflushed.clear()
+                return 0
+            rows = [(self._last_used[file_id], file_id) for file_id in self._unflushed]
+            self._db.executemany("UPDATE artifacts SET last_used_ts = ? WHERE file_id = ?", rows)
+            self._unflushed.clear()
+            return len(rows)
+
+    def last_used(self, file_id: str) -> float:
+        """Latest creation, rewrite or download time of a file (0.0 if unknown)"""
+        return self._last_used.get(file_id, 0.0)
+
+    def remove(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Drop a record, returning it if it existed"""
+        with self._lock:
+            record = self._records.pop(file_id, None)
+            if record is None:
+                return None
+            self._forget_memory(file_id, record)
+            self._unflushed.discard(file_id)
+            if self._db is not None:
+                self._db.execute("DELETE FROM artifacts WHERE file_id = ?", (file_id,))
+            return record
+
+    def for_session(self, session_id: Optional[str]) -> List[str]:
+        """File IDs registered to a session"""
+        with self._lock:
+            return list(self._by_session.get(session_id, ()))
+
+    def newest_first(self) -> Iterator[Dict[str, Any]]:
+        """Records from newest to oldest"""
+        with self._lock:
+            order = list(self._order)
+        for _, file_id in reversed(order):
+            record = self._records.get(file_id)
+            if record is not None:
+                yield record
+
+    def oldest_first(self) -> Iterator[Dict[str, Any]]:
+        """Records from oldest to newest"""
+        with self._lock:
+            order = list(self._order)
+        for _, file_id in order:
+            record = self._records.get(file_id)
+            if record is not None:
+                yield record
+
+    def least_recently_used(self, limit: int) -> List[Dict[str, Any]]:
+        """Up to limit records, least recently used first"""
+        with self._lock:
+            return [self._records[file_id] for _, file_id in self._lru[:limit]]
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Snapshot of all records, in no particular order"""
+        with self._lock:
+            return list(self._records.values())
+
+    def __contains__(self, file_id: str) -> bool:
+        return file_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self.flush_used()
+                self._db.close()
+                self._db = None
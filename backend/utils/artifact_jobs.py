@@ -0,0 +1,30 @@
+"""
+Artifact jobs for Contoso Agent Demo
+Functions executed inside artifact worker processes; kept free of server-side imports
+so spawned workers only load what rendering needs
+"""
+
+import os
+import time
+from io import BytesIO
+from typing import Any, Dict
+
+
+def warm_worker() -> None:
+    """Process initializer: import matplotlib and build the chart template once per worker"""
+    from utils.chart_renderer import chart_renderer
+    chart_renderer.render_monthly_trend(["warm-up"], [1.0], BytesIO(), "png")
+
+
+def ping(delay: float) -> int:
+    """Trivial task used to make every worker start (and warm up) ahead of traffic"""
+    time.sleep(delay)
+    return os.getpid()
+
+
+def render_chart(spec: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Render a chart spec to a file; runs in a worker process or on the CPU thread pool"""
+    from utils.chart_renderer import chart_renderer
+    if spec["chart"] != "monthly_trend":
+        raise ValueError(f"Unknown chart type '{spec['chart']}'")
+    return chart_renderer.render_monthly_trend(spec["months"], spec["amounts"], path, spec.get("format"))
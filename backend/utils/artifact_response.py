@@ -0,0 +1,131 @@
+"""
+Artifact responses for Contoso Agent Demo
+HTTP caching (ETag, Last-Modified, 304) and byte-range support for serving artifacts
+"""
+
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+# Artifacts never change once written (new content gets a new file ID), so clients
+# may keep them for a year; private because most belong to one session
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+CHUNK_SIZE = 64 * 1024
+INLINE_TYPES = ("image/",)
+
+
+def make_etag(file_id: str, size: int, created_ts: float) -> str:
+    """Strong validator for an immutable artifact"""
+    digest = hashlib.sha1(f"{file_id}:{size}:{created_ts}".encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, as RFC 9110 requires for this header)"""
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" header into an inclusive (start, end)
+
+    Returns None for headers to ignore (not bytes, or several ranges) and raises
+    ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    if not start_text:
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        if length <= 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or end < start:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+def _iter_file(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def artifact_response(request: Request, file_id: str, path: Path, info: Dict[str, Any],
+                      variant: str = "", extra_headers: Dict[str, str] = None) -> Response:
+    """
+    Build the response for one artifact, honouring conditional and range requests
+
+    Args:
+        request: Incoming request (If-None-Match, If-Modified-Since, Range, If-Range)
+        file_id: Artifact file ID
+        path: File on disk
+        info: FileManager.get_file_info record (mime_type, created_ts)
+        variant: Variant key when path is a resized/encoded copy, so each variant gets its own ETag
+        extra_headers: Headers describing the variant (Content-Encoding, Vary)
+    """
+    stat_info = os.stat(path)
+    size = stat_info.st_size
+    created_ts = info.get("created_ts", stat_info.st_mtime)
+    etag = make_etag(f"{file_id}:{variant}" if variant else file_id, size, created_ts)
+    media_type = info.get("mime_type") or "application/octet-stream"
+    disposition = "inline" if media_type.startswith(INLINE_TYPES) else "attachment"
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(created_ts, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'{disposition}; filename="{file_id}"',
+        **(extra_headers or {})
+    }
+
+    # Conditional GET: If-None-Match takes precedence over If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif "if-modified-since" in request.headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+            if int(created_ts) <= since:
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            length = end - start + 1
+            headers.update({
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(length)
+            })
+            return StreamingResponse(_iter_file(path, start, length), status_code=206,
+                                     media_type=media_type, headers=headers)
+
+    return FileResponse(path=str(path), media_type=media_type, headers=headers)
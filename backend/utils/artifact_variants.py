@@ -0,0 +1,187 @@
+"""
+Artifact variants for Contoso Agent Demo
+Downscaled images and gzip/brotli encodings of artifacts, generated once and cached beside the original
+"""
+
+import gzip
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from utils.tool_executor import tool_executor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Named sizes accepted by ?size=, as maximum widths in pixels
+NAMED_WIDTHS = {"thumb": 240, "small": 480, "medium": 800, "large": 1200}
+# Widths requested with ?w= snap up to one of these, so variants cannot multiply without bound
+VARIANT_WIDTHS = (160, 240, 320, 480, 640, 800, 1024, 1200)
+RESIZABLE_TYPES = {"image/png", "image/jpeg", "image/webp"}
+COMPRESSIBLE_TYPES = {"text/csv", "application/json", "text/plain", "image/svg+xml"}
+# Bytes read per step while compressing, so large exports never sit in memory whole
+COMPRESS_CHUNK_SIZE = 256 * 1024
+
+
+def _resize_image(source: str, target: str, width: int, image_format: str) -> bool:
+    """Write a copy of the image scaled down to width; False when it is already that narrow"""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        if image.width <= width:
+            return False
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        options = {"optimize": True} if image_format == "PNG" else {"quality": 85}
+        resized.save(target, format=image_format, **options)
+    return True
+
+
+def _compress(source: str, target: str, encoding: str) -> bool:
+    """Write an encoded copy of the file, streaming it through the compressor in chunks"""
+    with open(source, "rb") as reader, open(target, "wb") as writer:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=5)
+            while True:
+                chunk = reader.read(COMPRESS_CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(compressor.process(chunk))
+            writer.write(compressor.finish())
+        else:
+            # An empty filename keeps the temporary file's name out of the gzip header
+            with gzip.GzipFile(filename="", mode="wb", fileobj=writer, compresslevel=6) as encoded:
+                shutil.copyfileobj(reader, encoded, COMPRESS_CHUNK_SIZE)
+    return True
+
+
+class ArtifactVariants:
+    """
+    Resolves the file to serve for an artifact request
+
+    Variants are stored as hidden files next to the original
+    (.<file_id>.w480.png, .<file_id>.gz), so they share its shard and session
+    directory, are skipped by indexing, and are deleted with it.
+    """
+
+    IMAGE_FORMATS = {"image/png": "PNG", "image/jpeg": "JPEG", "image/webp": "WEBP"}
+
+    def __init__(self):
+        self.enabled = os.getenv("ARTIFACT_VARIANTS_ENABLED", "true").lower() == "true"
+        self.compress_min_bytes = int(os.getenv("ARTIFACT_COMPRESS_MIN_BYTES", "1024"))
+
+        # Metrics
+        self.generated = 0
+        self.served = 0
+
+    @staticmethod
+    def variant_path(original: Path, suffix: str) -> Path:
+        return original.with_name(f".{original.name}.{suffix}")
+
+    @staticmethod
+    def snap_width(width: int) -> int:
+        for candidate in VARIANT_WIDTHS:
+            if candidate >= width:
+                return candidate
+        return VARIANT_WIDTHS[-1]
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick br or gzip from an Accept-Encoding header (q=0 means refused)"""
+        accepted = {}
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip().lower()] = quality
+        if brotli is not None and accepted.get("br", 0) > 0:
+            return "br"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    async def _ensure(self, original: Path, target: Path, kind: str, func, *args) -> bool:
+        """Generate a variant once; artifacts are immutable, so an existing variant is current"""
+        if target.exists():
+            return True
+        temp = target.with_name(f"{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            created = await tool_executor.run(kind, func, str(original), str(temp), *args,
+                                              name=f"ArtifactVariants.{func.__name__}")
+            if not created:
+                return False
+            os.replace(temp, target)
+            self.generated += 1
+            return True
+        finally:
+            if temp.exists():
+                temp.unlink()
+
+    async def resolve(self, original: Path, mime_type: str, width: Optional[int] = None,
+                      size: Optional[str] = None, accept_encoding: str = "",
+                      ranged: bool = False) -> Tuple[Path, str, Dict[str, str]]:
+        """
+        Find (or build) the best representation of an artifact for this request
+
+        Args:
+            original: Original file path
+            mime_type: Original MIME type
+            width: Requested maximum width in pixels (?w=)
+            size: Named size (?size=thumb|small|medium|large)
+            accept_encoding: Client Accept-Encoding header
+            ranged: The request has a Range header; compressible files are then
+                served unencoded, so resuming a download never waits for (or
+                starts) a compression job
+
+        Returns:
+            (path to serve, variant key for the ETag, extra response headers)
+        """
+        if not self.enabled:
+            return original, "", {}
+
+        requested_width = NAMED_WIDTHS.get(size) if size else width
+        if requested_width and mime_type in RESIZABLE_TYPES:
+            snapped = self.snap_width(requested_width)
+            target = self.variant_path(original, f"w{snapped}{original.suffix}")
+            try:
+                resized = await self._ensure(original, target, "cpu", _resize_image, snapped, self.IMAGE_FORMATS[mime_type])
+            except Exception as e:
+                # Unreadable image or Pillow missing: the original still works
+                print(f"Could not resize {original.name}: {e}")
+                resized = False
+            if resized:
+                self.served += 1
+                return target, f"w{snapped}", {}
+            return original, "", {}
+
+        if mime_type in COMPRESSIBLE_TYPES:
+            headers = {"Vary": "Accept-Encoding"}
+            encoding = None if ranged else self.choose_encoding(accept_encoding)
+            if encoding and original.stat().st_size >= self.compress_min_bytes:
+                suffix = "br" if encoding == "br" else "gz"
+                target = self.variant_path(original, suffix)
+                await self._ensure(original, target, "cpu", _compress, encoding)
+                self.served += 1
+                return target, suffix, {**headers, "Content-Encoding": encoding}
+            return original, "", headers
+
+        return original, "", {}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "enabled": self.enabled,
+            "brotli": brotli is not None,
+            "generated": self.generated,
+            "served": self.served
+        }
+
+
+# Global instance
+artifact_variants = ArtifactVariants()
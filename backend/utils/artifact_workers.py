@@ -0,0 +1,107 @@
+"""
+Artifact workers for Contoso Agent Demo
+Process pool with warm matplotlib workers for chart rendering
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from utils.artifact_jobs import ping, render_chart, warm_worker
+from utils.chart_cache import chart_cache
+from utils.tool_executor import tool_executor
+
+
+class ArtifactWorkers:
+    """
+    Renders chart artifacts on a pool of pre-warmed worker processes
+
+    Chart specs go in, files are written by the workers, and file IDs are
+    registered by the parent process. With ARTIFACT_WORKERS=0 the same work
+    runs on the tool executor's CPU thread pool instead.
+
+    CSV exports are not sent here: they stream a bill from the line item
+    store in chunks on the I/O thread pool, and shipping the bill to another
+    process would mean pickling all of it.
+    """
+
+    def __init__(self, workers: int = None, start_method: str = None):
+        self.workers = workers if workers is not None else int(os.getenv("ARTIFACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+        # spawn keeps workers independent of the server's threads and event loop
+        self.start_method = start_method or os.getenv("ARTIFACT_WORKER_START_METHOD", "spawn")
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.charts_rendered = 0
+
+    def start(self) -> None:
+        """Create the pool and start every worker so the first request finds them warm"""
+        if self.workers <= 0 or self._pool is not None:
+            return
+        pool = self._get_pool()
+        # Overlapping pings force the pool to spawn all workers now rather than on demand
+        for _ in range(self.workers):
+            pool.submit(ping, 0.2)
+        print(f"Artifact workers starting: {self.workers} processes ({self.start_method})")
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=warm_worker
+                )
+            return self._pool
+
+    async def _submit(self, kind: str, func, *args) -> Any:
+        pool = self._get_pool()
+        if pool is None:
+            return await tool_executor.run(kind, func, *args)
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+    async def render_chart(self, spec: Dict[str, Any], path: Union[str, Path]) -> Dict[str, Any]:
+        """Render a chart spec to a path on a worker"""
+        info = await self._submit("cpu", render_chart, spec, str(path))
+        self.charts_rendered += 1
+        return info
+
+    async def create_chart(self, base_name: str, spec: Dict[str, Any], cache_params: Dict[str, Any]) -> str:
+        """
+        Return the file ID of a chart, rendering it on a worker unless already cached
+
+        Args:
+            base_name: File name prefix, e.g. "monthly_bill_trend"
+            spec: Chart type and data, e.g. {"chart": "monthly_trend", "months": [...], "amounts": [...], "format": "png"}
+            cache_params: Renderer settings that affect the output (see ChartRenderer.cache_params)
+        """
+        async def render(path: Path) -> None:
+            await self.render_chart(spec, path)
+
+        return await chart_cache.get_or_render(base_name, cache_params["format"], {**spec, **cache_params}, render)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "mode": "process" if self.workers > 0 else "thread",
+            "charts_rendered": self.charts_rendered
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Global instance
+artifact_workers = ArtifactWorkers()
@@ -0,0 +1,185 @@
+"""
+Chart artifact cache for Contoso Agent Demo
+Content-addressed chart files: identical data and chart settings reuse the file already on disk
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict
+
+from utils.file_manager import FileManager, file_manager
+
+# Cached charts are named <base_name>_<content hash>.<ext>
+HASH_LENGTH = 16
+CACHED_FILE_PATTERN = re.compile(rf"^(?P<base>.+)_(?P<digest>[0-9a-f]{{{HASH_LENGTH}}})\.(?P<ext>\w+)$")
+
+
+class ChartCache:
+    """
+    Size-bounded LRU of rendered chart files, keyed by a hash of the chart inputs
+
+    Entries live in the artifacts directory alongside other files, so
+    FileManager.cleanup_old_files may delete them; a missing file is treated as a
+    miss and re-rendered. Hits touch the file so charts still in use are not aged
+    out by cleanup. Charts from earlier runs are adopted by start(), once the
+    file manager has loaded its index.
+    """
+
+    def __init__(self, files: FileManager = None, max_entries: int = None, max_bytes: int = None):
+        self.files = files or file_manager
+        self.max_entries = max_entries or int(os.getenv("CHART_CACHE_MAX_ENTRIES", "256"))
+        self.max_bytes = max_bytes or int(os.getenv("CHART_CACHE_MAX_MB", "100")) * 1024 * 1024
+        self.enabled = os.getenv("CHART_CACHE_ENABLED", "true").lower() == "true"
+
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        # One render per key at a time; concurrent requests wait for the first
+        self._render_locks: Dict[str, asyncio.Lock] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._started = False
+        self.files.on_remove(self.forget)
+
+    def start(self) -> None:
+        """
+        Adopt cached charts left on disk by a previous run
+
+        Call after FileManager.start(), which loads the artifact index this
+        reads; like it, runs in the serving process rather than at import.
+        """
+        if self._started:
+            return
+        self._started = True
+        self._load_existing()
+
+    @staticmethod
+    def make_key(inputs: Dict[str, Any]) -> str:
+        """Stable content hash of the chart data and rendering parameters"""
+        payload = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+    def _load_existing(self) -> None:
+        """Add indexed chart files to the cache, least recently used first, then apply the limits"""
+        existing = [
+            (self.files.last_used(record), record["file_id"], record["size_bytes"])
+            for record in self.files.index.oldest_first()
+            if CACHED_FILE_PATTERN.match(record["file_id"])
+        ]
+        with self._lock:
+            for _, file_id, size in sorted(existing):
+                if file_id not in self._entries:
+                    self._entries[file_id] = size
+                    self._total_bytes += size
+        self._evict()
+
+    async def get_or_render(self, base_name: str, extension: str, inputs: Dict[str, Any],
+                            render: Callable[[Path], Awaitable[Any]]) -> str:
+        """
+        Return the file ID for a chart, rendering it only if it is not cached
+
+        Args:
+            base_name: File name prefix, e.g. "monthly_bill_trend"
+            extension: Output file extension
+            inputs: Everything that affects the rendered output (data and parameters)
+            render: Coroutine function that writes the chart to the given path
+
+        Returns:
+            File ID of the cached or newly rendered chart
+        """
+        if not self.enabled:
+            file_id = self.files.generate_file_id(base_name, extension)
+            await render(self.files.get_artifact_path(file_id))
+            return file_id
+
+        file_id = f"{base_name}_{self.make_key(inputs)}.{extension}"
+        lock = self._render_locks.setdefault(file_id, asyncio.Lock())
+        async with lock:
+            if self._lookup(file_id):
+                self.hits += 1
+                return file_id
+
+            self.misses += 1
+            path = self.files.get_artifact_path(file_id)
+            # Render beside the final path and swap in, so readers never see a partial file
+            temp_path = path.with_name(f".{file_id}.tmp")
+            try:
+                await render(temp_path)
+                os.replace(temp_path, path)
+            finally:
+                if temp_path.exists():
+                    temp_path.unlink()
+
+            self._add(file_id, path.stat().st_size)
+        if not lock.locked():
+            self._render_locks.pop(file_id, None)
+        return file_id
+
+    def _lookup(self, file_id: str) -> bool:
+        """True if the chart is cached and still on disk; refreshes its LRU position"""
+        path = self.files.get_artifact_path(file_id)
+        with self._lock:
+            if file_id not in self._entries:
+                return False
+            if not path.exists():
+                # Removed by hand since it was cached
+                self._total_bytes -= self._entries.pop(file_id)
+                return False
+            self._entries.move_to_end(file_id)
+        self.files.touch(file_id)
+        return True
+
+    def forget(self, file_id: str) -> None:
+        """Drop an entry whose file was deleted elsewhere (e.g. by cleanup_old_files)"""
+        with self._lock:
+            if file_id in self._entries:
+                self._total_bytes -= self._entries.pop(file_id)
+
+    def _add(self, file_id: str, size: int) -> None:
+        with self._lock:
+            self._total_bytes -= self._entries.pop(file_id, 0)
+            self._entries[file_id] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used charts beyond the entry and byte limits"""
+        with self._lock:
+            victims = []
+            while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                file_id, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                victims.append(file_id)
+            self.evictions += len(victims)
+
+        for file_id in victims:
+            self.files.remove(file_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and disk usage of cached charts"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Global instance
+chart_cache = ChartCache()
@@ -0,0 +1,146 @@
+"""
+Chart rendering for Contoso Agent Demo
+Renders Contoso-branded charts with matplotlib's object-oriented Agg API, off the event loop
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+
+
+# Contoso brand colors
+CONTOSO_BLUE = "#0078D4"
+DARK_GREY = "#333333"
+LIGHT_GREY = "#CCCCCC"
+
+
+class ChartRenderer:
+    """
+    Renders charts from a cached, pre-styled figure template
+
+    Styling (title, axes, grid, branding, margins) is applied once per thread; each
+    render only swaps the data artists. No pyplot state machine, no tight_layout and
+    no bbox_inches='tight' second pass.
+    """
+
+    FORMATS = ("png", "webp", "svg")
+    # Bump when chart styling changes so cached charts are re-rendered
+    STYLE_VERSION = 1
+
+    def __init__(self, dpi: int = None, width_inches: float = None, height_inches: float = None,
+                 image_format: str = None):
+        self.dpi = dpi or int(os.getenv("CHART_DPI", "100"))
+        self.width_inches = width_inches or float(os.getenv("CHART_WIDTH_INCHES", "12"))
+        self.height_inches = height_inches or float(os.getenv("CHART_HEIGHT_INCHES", "7"))
+        self.image_format = (image_format or os.getenv("CHART_FORMAT", "png")).lower()
+        if self.image_format not in self.FORMATS:
+            raise ValueError(f"Unsupported chart format '{self.image_format}', expected one of {self.FORMATS}")
+
+        # Figures are not thread-safe, so each worker thread keeps its own template
+        self._local = threading.local()
+
+    @property
+    def pixel_size(self) -> str:
+        """Output dimensions for raster formats, e.g. '1200x700'"""
+        return f"{int(self.width_inches * self.dpi)}x{int(self.height_inches * self.dpi)}"
+
+    def cache_params(self, image_format: str = None) -> Dict[str, Any]:
+        """Rendering settings that change the output file, for content-addressed caching"""
+        return {
+            "format": (image_format or self.image_format).lower(),
+            "dpi": self.dpi,
+            "size": [self.width_inches, self.height_inches],
+            "style_version": self.STYLE_VERSION
+        }
+
+    def _monthly_trend_template(self):
+        """Build (once per thread) the styled monthly trend figure"""
+        template = getattr(self._local, "monthly_trend", None)
+        if template is not None:
+            return template
+
+        fig = Figure(figsize=(self.width_inches, self.height_inches), facecolor="white")
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(1, 1, 1)
+
+        ax.set_title('Monthly Bill Trend', fontsize=18, fontweight='bold', color=DARK_GREY, pad=20)
+        ax.set_xlabel('Billing Period', fontsize=12, color=DARK_GREY)
+        ax.set_ylabel('Amount (£)', fontsize=12, color=DARK_GREY)
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'£{x:.0f}'))
+
+        ax.grid(True, linestyle='--', alpha=0.3, color=LIGHT_GREY)
+        ax.set_axisbelow(True)
+
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_color(LIGHT_GREY)
+        ax.spines['bottom'].set_color(LIGHT_GREY)
+        ax.tick_params(colors=DARK_GREY)
+
+        fig.text(0.95, 0.98, 'CONTOSO',
+                 fontsize=14, fontweight='bold',
+                 color=CONTOSO_BLUE, alpha=0.8,
+                 ha='right', va='top')
+
+        # Fixed margins leave room for rotated period labels without a layout pass
+        fig.subplots_adjust(left=0.08, right=0.97, bottom=0.2, top=0.88)
+
+        template = {"figure": fig, "axes": ax, "artists": []}
+        self._local.monthly_trend = template
+        return template
+
+    def render_monthly_trend(self, months: List[str], amounts: List[float],
+                             path: Union[str, Path], image_format: str = None) -> Dict[str, Any]:
+        """
+        Render the month-on-month bill trend chart to a file
+
+        Args:
+            months: Billing period labels
+            amounts: Bill totals, one per period
+            path: Output file path
+            image_format: png, webp or svg (defaults to CHART_FORMAT)
+
+        Returns:
+            Metadata describing the rendered chart
+        """
+        image_format = (image_format or self.image_format).lower()
+        template = self._monthly_trend_template()
+        fig, ax = template["figure"], template["axes"]
+
+        # Swap out the previous render's data artists
+        for artist in template["artists"]:
+            artist.remove()
+        template["artists"] = []
+
+        positions = list(range(len(months)))
+        bars = ax.bar(positions, amounts, color=CONTOSO_BLUE, alpha=0.8, edgecolor=DARK_GREY, linewidth=1)
+        template["artists"].extend(bars)
+
+        for bar, amount in zip(bars, amounts):
+            height = bar.get_height()
+            label = ax.text(bar.get_x() + bar.get_width() / 2., height + 2,
+                            f'£{amount:.0f}', ha='center', va='bottom',
+                            fontweight='bold', color=DARK_GREY)
+            template["artists"].append(label)
+
+        ax.set_xticks(positions)
+        ax.set_xticklabels(months, rotation=45, ha='right')
+        ax.set_xlim(-0.6, len(months) - 0.4)
+        ax.set_ylim(0, max(amounts) * 1.12 if amounts else 1)
+
+        fig.savefig(path, format=image_format, dpi=self.dpi, facecolor='white')
+
+        return {
+            "format": image_format,
+            "dimensions": self.pixel_size if image_format != "svg" else "vector",
+            "dpi": self.dpi
+        }
+
+
+# Global instance
+chart_renderer = ChartRenderer()
@@ -4,20 +4,84 @@ Supports CSV, JSON, images, and other artifacts for frontend rendering
 """
 
 import os
+import shutil
+import time
 import uuid
 import json
+import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Union
 from pathlib import Path
+from glob import escape as glob_escape
 import mimetypes
 
+from utils.artifact_index import ArtifactIndex
+
+
+# Scope for artifacts not owned by one session (e.g. content-addressed charts)
+SHARED_SCOPE = "shared"
+# Written in each session scope directory with the full session ID, for the start-up backfill
+SESSION_MARKER = ".session_id"
+
 
 class FileManager:
-    """Simple file manager with direct filesystem operations - no metadata cache"""
+    """
+    File manager backed by an in-memory metadata index (optionally persisted to SQLite)
+    
+    Artifacts are stored as artifacts/<session scope or "shared">/<2-char hash prefix>/<file_id>,
+    so no directory grows with the total file count and a session's files can be
+    deleted together. File IDs stay globally unique and are resolved through the index.
+    """
     
-    def __init__(self, artifacts_dir: str = "artifacts"):
-        self.artifacts_dir = Path(artifacts_dir)
+    def __init__(self, artifacts_dir: str = None, index_db: str = None):
+        self.artifacts_dir = Path(artifacts_dir or os.getenv("ARTIFACTS_DIR", "artifacts"))
         self.artifacts_dir.mkdir(exist_ok=True)
+        self._removal_hooks = []
+        
+        # ARTIFACT_INDEX_DB persists the index across restarts; otherwise it is rebuilt from disk
+        self.index_db = index_db if index_db is not None else os.getenv("ARTIFACT_INDEX_DB", "")
+        self.index = ArtifactIndex()
+        self._started = False
+    
+    def start(self) -> None:
+        """
+        Load the persisted index, migrate the old flat layout and index files already on disk
+        
+        Run once by the serving process (web server lifespan, terminal demo)
+        rather than at import, so processes that only import this module -
+        artifact workers spawned from `python main.py` re-import main - do no
+        disk work.
+        """
+        if self._started:
+            return
+        self._started = True
+        if self.index_db:
+            persisted = ArtifactIndex(self.index_db)
+            for record in self.index.oldest_first():
+                persisted.put(record)
+            self.index = persisted
+        if os.getenv("ARTIFACT_MIGRATE_FLAT", "true").lower() == "true":
+            migrated = self.migrate_flat_layout()
+            if migrated:
+                print(f"Moved {migrated} artifacts from the flat layout into {self.artifacts_dir / SHARED_SCOPE}")
+        self._backfill_index()
+    
+    @staticmethod
+    def _scope(session_id: Optional[str]) -> str:
+        """
+        Directory name for a session's artifacts
+        
+        Session IDs come from the client URL, so the name is a hash of the whole
+        ID: distinct sessions never share (and never delete) a directory, and
+        the name is always safe on disk and never equals the shared scope.
+        """
+        if not session_id:
+            return SHARED_SCOPE
+        return "s_" + hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:40]
+    
+    @staticmethod
+    def _shard(file_id: str) -> str:
+        return hashlib.sha1(file_id.encode("utf-8")).hexdigest()[:2]
     
     def generate_file_id(self, base_name: str, file_extension: str) -> str:
         """Generate unique file ID with timestamp and UUID"""
@@ -26,15 +90,17 @@ class FileManager:
         return f"{base_name}_{timestamp}_{unique_id}.{file_extension}"
     
     def save_artifact(self, file_id: str, file_path: Union[str, Path], 
-                     description: str = "", metadata: Dict[str, Any] = None) -> str:
+                     description: str = "", metadata: Dict[str, Any] = None,
+                     session_id: str = None) -> str:
         """
-        Register an artifact file - simplified version that just confirms file exists
+        Register an artifact file in the metadata index
         
         Args:
             file_id: Unique file identifier  
             file_path: Path to the saved file
-            description: Human-readable description (stored in memory only)
-            metadata: Additional metadata (ignored in simple version)
+            description: Human-readable description
+            metadata: Additional metadata returned with the file info
+            session_id: Owning session; None for shared artifacts
             
         Returns:
             file_id: The registered file ID
@@ -43,45 +109,114 @@ class FileManager:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        # File exists, that's all we need to verify
+        existing = self.index.get(file_id)
+        record = self._build_record(file_id, file_path, description, metadata, session_id)
+        if existing:
+            # Re-registering (e.g. a cached chart) keeps the original creation time
+            record["created_ts"] = existing["created_ts"]
+            record["created_at"] = existing["created_at"]
+        self.index.put(record)
         return file_id
     
-    def get_artifact_path(self, file_id: str) -> Path:
-        """Get the full path for saving an artifact"""
-        return self.artifacts_dir / file_id
-    
-    def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
-        """Get file metadata by checking filesystem directly"""
-        file_path = self.artifacts_dir / file_id
-        
-        if not file_path.exists():
-            return None
-        
-        # Extract info directly from filesystem
-        file_extension = file_path.suffix.lower().lstrip('.')
-        mime_type, _ = mimetypes.guess_type(str(file_path))
-        
-        # Get file stats
+    def _build_record(self, file_id: str, file_path: Path, description: str = "",
+                      metadata: Dict[str, Any] = None, session_id: str = None) -> Dict[str, Any]:
+        """Index record for a file, from one stat call"""
         stat_info = file_path.stat()
-        
-        # Generate description from filename
+        file_extension = file_path.suffix.lower().lstrip('.')
+        mime_type, _ = mimetypes.guess_type(file_path.name)
         base_name = file_path.stem.split('_')[0]  # Get part before timestamp
-        description = self._generate_description(base_name, file_extension)
-        
         return {
+            "file_id": file_id,
             "file_path": str(file_path),
             "file_type": file_extension,
             "mime_type": mime_type or f"application/{file_extension}",
-            "description": description,
+            "description": description or self._generate_description(base_name, file_extension),
+            "created_ts": stat_info.st_mtime,
             "created_at": datetime.fromtimestamp(stat_info.st_mtime).isoformat(),
-            "size_bytes": stat_info.st_size
+            "size_bytes": stat_info.st_size,
+            "session_id": session_id,
+            "metadata": metadata or {}
         }
     
+    def _backfill_index(self) -> None:
+        """Index files already on disk that the index does not know about (one scan at start-up)"""
+        owners: Dict[str, Optional[str]] = {SHARED_SCOPE: None}
+        for file_path in self.artifacts_dir.glob("*/*/*"):
+            if file_path.is_file() and not file_path.name.startswith(".") and file_path.name not in self.index:
+                scope = file_path.relative_to(self.artifacts_dir).parts[0]
+                if scope not in owners:
+                    marker = self.artifacts_dir / scope / SESSION_MARKER
+                    # Directories from before session markers are named after the session
+                    owners[scope] = marker.read_text(encoding="utf-8") if marker.is_file() else scope
+                self.index.put(self._build_record(file_path.name, file_path, session_id=owners[scope]))
+        # Forget records whose files were removed while the server was down
+        for record in list(self.index.oldest_first()):
+            if not Path(record["file_path"]).exists():
+                self.index.remove(record["file_id"])
+    
+    def get_artifact_path(self, file_id: str, session_id: str = None) -> Path:
+        """Get the full path for saving an artifact, creating its shard directory"""
+        scope_dir = self.artifacts_dir / self._scope(session_id)
+        shard_dir = scope_dir / self._shard(file_id)
+        if not shard_dir.is_dir():
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            if session_id and not (scope_dir / SESSION_MARKER).exists():
+                (scope_dir / SESSION_MARKER).write_text(session_id, encoding="utf-8")
+        return shard_dir / file_id
+    
+    def _locate(self, file_id: str) -> Path:
+        """Where a file lives: its indexed path, else the shared shard path"""
+        record = self.index.get(file_id)
+        if record:
+            return Path(record["file_path"])
+        return self.artifacts_dir / SHARED_SCOPE / self._shard(file_id) / file_id
+    
+    def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Get file metadata from the index"""
+        record = self.index.get(file_id)
+        if record is None:
+            # Written outside save_artifact; index it on first sight
+            file_path = self._locate(file_id)
+            if not file_path.is_file():
+                return None
+            record = self._build_record(file_id, file_path)
+            self.index.put(record)
+        
+        return {key: value for key, value in record.items() if key != "file_id"}
+    
     def get_file_path(self, file_id: str) -> Optional[Path]:
         """Get full file path by file ID"""
-        file_path = self.artifacts_dir / file_id
+        file_path = self._locate(file_id)
         return file_path if file_path.exists() else None
     
+    def touch(self, file_id: str) -> None:
+        """Mark a file as recently written so age-based cleanup keeps it"""
+        os.utime(self._locate(file_id))
+        self.index.update(file_id, modified_ts=time.time())
+    
+    def record_access(self, file_id: str) -> None:
+        """Note that a file was just served, for least-recently-used eviction"""
+        self.index.mark_used(file_id, time.time())
+    
+    def last_used(self, record: Dict[str, Any]) -> float:
+        """Most recent of a file's creation, rewrite (touch) and last download"""
+        return self.index.last_used(record["file_id"])
+    
+    def remove(self, file_id: str) -> bool:
+        """Delete an artifact and its index record, notifying removal hooks"""
+        file_path = self._locate(file_id)
+        record = self.index.remove(file_id)
+        removed = file_path.exists()
+        if removed:
+            file_path.unlink()
+        # Resized/compressed variants are hidden files beside the original
+        if file_path.parent.exists():
+            for variant in file_path.parent.glob(f".{glob_escape(file_id)}.*"):
+                variant.unlink(missing_ok=True)
+        for hook in self._removal_hooks:
+            hook(file_id)
+        return removed or record is not None
+    
     def _generate_description(self, base_name: str, file_type: str) -> str:
         """Generate description from filename and type"""
         descriptions = {
@@ -125,48 +260,84 @@ class FileManager:
             return f"[FILE:{file_id}:{display}]"
     
     def list_files(self, file_type: str = None, limit: int = None) -> List[Dict[str, Any]]:
-        """List files by scanning filesystem directly"""
+        """List indexed files, newest first"""
         files = []
+        for record in self.index.newest_first():
+            # Filter by type if specified
+            if file_type and record["file_type"] != file_type:
+                continue
+            files.append({
+                "file_id": record["file_id"],
+                **self.get_file_info(record["file_id"])
+            })
+            if limit and len(files) >= limit:
+                break
         
-        # Scan artifacts directory
-        for file_path in self.artifacts_dir.glob("*"):
-            if file_path.is_file():
-                file_extension = file_path.suffix.lower().lstrip('.')
-                
-                # Filter by type if specified
-                if file_type and file_extension != file_type:
-                    continue
-                
-                file_info = self.get_file_info(file_path.name)
-                if file_info:
-                    files.append({
-                        "file_id": file_path.name,
-                        **file_info
-                    })
-        
-        # Sort by modification time (newest first)
-        files.sort(key=lambda x: x["created_at"], reverse=True)
-        
-        if limit:
-            files = files[:limit]
-            
         return files
     
-    def cleanup_old_files(self, max_age_hours: int = 24) -> int:
-        """Clean up files older than specified hours"""
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+    def on_remove(self, hook) -> None:
+        """Register a callback (taking the file ID) to run when an artifact is removed"""
+        self._removal_hooks.append(hook)
+
+    def cleanup_old_files(self, max_age_hours: int = 24, batch_size: int = None) -> int:
+        """
+        Clean up files not written or served for longer than the specified hours
+        
+        Walks the index oldest first and stops at the first file inside the age
+        limit, so each call only touches expired files. Pass batch_size to bound
+        the work done per call and run cleanup incrementally.
+        """
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).timestamp()
         removed_count = 0
         
-        # Scan directory for old files
-        for file_path in self.artifacts_dir.glob("*"):
-            if file_path.is_file():
-                file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-                if file_time < cutoff_time:
-                    file_path.unlink()
+        for record in self.index.oldest_first():
+            if record["created_ts"] >= cutoff:
+                break
+            if self.last_used(record) < cutoff:
+                if self.remove(record["file_id"]):
                     removed_count += 1
+                if batch_size and removed_count >= batch_size:
+                    break
+        
+        return removed_count
+    
+    def delete_session_artifacts(self, session_id: str) -> int:
+        """Delete every artifact owned by a session (shared artifacts are kept)"""
+        if not session_id:
+            return 0
         
+        removed_count = 0
+        for file_id in self.index.for_session(session_id):
+            if self.remove(file_id):
+                removed_count += 1
+        # Also clear anything written for the session but never registered
+        shutil.rmtree(self.artifacts_dir / self._scope(session_id), ignore_errors=True)
         return removed_count
+    
+    def migrate_flat_layout(self) -> int:
+        """
+        Move artifacts from the old flat artifacts/<file_id> layout into the shared scope
+        
+        Their owning session is unknown, so they become shared artifacts.
+        
+        Returns:
+            Number of files moved
+        """
+        moved = 0
+        for file_path in self.artifacts_dir.iterdir():
+            if not file_path.is_file() or file_path.name.startswith("."):
+                continue
+            # Leave the index database (and its -wal/-shm files) in place if it lives here
+            db_path = Path(self.index.db_path).resolve() if self.index.db_path else None
+            if db_path and file_path.parent.resolve() == db_path.parent and file_path.name.startswith(db_path.name):
+                continue
+            target = self.get_artifact_path(file_path.name)
+            os.replace(file_path, target)
+            if file_path.name in self.index:
+                self.index.update(file_path.name, file_path=str(target), session_id=None)
+            moved += 1
+        return moved
 
 
 # Global instance
-file_manager = FileManager()
\ No newline at end of file
+file_manager = FileManager()
@@ -0,0 +1,181 @@
+"""
+Conversation history management for Contoso Agent Demo
+Bounds the context sent per turn with a recent-message window, token budgets and background summaries
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from semantic_kernel.connectors.ai.open_ai import AzureChatPromptExecutionSettings
+from semantic_kernel.contents import AuthorRole, ChatHistory, ChatMessageContent
+
+from utils.session_state import SessionState
+from utils.tool_output import tool_output
+
+SUMMARY_INSTRUCTIONS = (
+    "Summarise this conversation between a Contoso mobile customer and Contoso's support agents "
+    "for the agents who will continue it. Keep the customer's goals, bill IDs, amounts, dates, "
+    "plan/add-on/roaming IDs, ticket IDs and anything already agreed or ruled out. Omit greetings "
+    "and file or widget references. Reply with the summary only, at most 150 words."
+)
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def _parse_budgets(spec: str) -> Dict[str, int]:
+    """Parse "Agent=tokens,Agent=tokens" into a dict"""
+    budgets = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip().isdigit():
+            budgets[name.strip()] = int(value)
+    return budgets
+
+
+class HistoryManager:
+    """
+    Builds each turn's orchestration task from a session's history
+
+    A session's older messages are folded into a running summary by a
+    background LLM call once the unsummarised part outgrows the window, so a
+    turn sends the summary plus the most recent messages. History is handled
+    in blocks of HISTORY_WINDOW_MESSAGES - HISTORY_KEEP_MESSAGES messages
+    counted from the summarised point: a summary roll folds whole blocks,
+    and when the task is over the entry agent's token budget (e.g. while a
+    summary is pending) whole blocks are dropped from the front. Between
+    those points each turn only appends to the task, so its prefix stays
+    byte-identical for prompt caching.
+
+    Earlier turns' tool calls and results are never re-sent: the session
+    stores only delivered replies (see SessionState), and build_task drops
+    any tool message as well.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("HISTORY_MANAGER_ENABLED", "true").lower() == "true"
+        self.window_messages = int(os.getenv("HISTORY_WINDOW_MESSAGES", "12"))
+        self.keep_messages = int(os.getenv("HISTORY_KEEP_MESSAGES", "6"))
+        # Messages folded into the summary, or trimmed, at a time
+        self.block_messages = max(2, self.window_messages - self.keep_messages)
+        self.default_budget = int(os.getenv("HISTORY_MAX_TOKENS", "3000"))
+        self.budgets = _parse_budgets(os.getenv("HISTORY_AGENT_BUDGETS", ""))
+        self.summaries_enabled = os.getenv("HISTORY_SUMMARY_ENABLED", "true").lower() == "true"
+        self.summary_max_tokens = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "300"))
+
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        # Metrics
+        self.summaries = 0
+        self.summary_failures = 0
+        self.trimmed_messages = 0
+
+    def budget_for(self, agent_name: Optional[str]) -> int:
+        return self.budgets.get(agent_name, self.default_budget)
+
+    def build_task(self, state: SessionState, agent_name: str = None) -> List[ChatMessageContent]:
+        """
+        Messages to send for the current turn
+
+        The running summary (as a system message) followed by the unsummarised
+        messages, from a block boundary when the budget requires it. Only if
+        the customer's latest block alone is over budget are single messages
+        dropped, keeping at least the latest message.
+
+        Args:
+            state: Session whose history to use
+            agent_name: Agent that receives the task first, for its token budget (HISTORY_AGENT_BUDGETS)
+        """
+        if not self.enabled:
+            return state.get_task()
+
+        recent = state.history[state.summarized_upto:]
+        summary = []
+        if state.summary:
+            summary = [ChatMessageContent(role=AuthorRole.SYSTEM, content=SUMMARY_PREFIX + state.summary)]
+
+        budget = self.budget_for(agent_name)
+        tokens = [tool_output.count_tokens(m.content or "") for m in recent]
+        total = sum(tokens) + sum(tool_output.count_tokens(m.content) for m in summary)
+        start = 0
+        while total > budget and start + self.block_messages < len(recent):
+            total -= sum(tokens[start:start + self.block_messages])
+            start += self.block_messages
+        while total > budget and start < len(recent) - 1:
+            total -= tokens[start]
+            start += 1
+        # Count each message once, the first turn it is left out (summarised ones are not trimmed)
+        trimmed_upto = state.summarized_upto + start
+        self.trimmed_messages += max(0, trimmed_upto - max(state.trimmed_upto, state.summarized_upto))
+        state.trimmed_upto = max(state.trimmed_upto, trimmed_upto)
+
+        return summary + [m for m in recent[start:] if m.role != AuthorRole.TOOL]
+
+    def needs_summary(self, state: SessionState) -> bool:
+        return len(state.history) - state.summarized_upto > self.window_messages
+
+    def schedule_summary(self, state: SessionState) -> None:
+        """Summarise older messages in the background once the window is exceeded"""
+        if not (self.enabled and self.summaries_enabled and self.needs_summary(state)):
+            return
+        running = self._tasks.get(state.session_id)
+        if running is not None and not running.done():
+            return
+        task = asyncio.create_task(self._summarize(state))
+        self._tasks[state.session_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(state.session_id, None))
+
+    async def _summarize(self, state: SessionState) -> None:
+        # Fold whole blocks, leaving at least keep_messages unsummarised, so the
+        # summarised point only ever moves to a block boundary
+        blocks = (len(state.history) - self.keep_messages - state.summarized_upto) // self.block_messages
+        if blocks <= 0:
+            return
+        upto = state.summarized_upto + blocks * self.block_messages
+
+        history = ChatHistory()
+        history.add_system_message(SUMMARY_INSTRUCTIONS)
+        transcript = []
+        if state.summary:
+            transcript.append(SUMMARY_PREFIX + state.summary)
+        for message in state.history[state.summarized_upto:upto]:
+            speaker = "Customer" if message.role == AuthorRole.USER else (message.name or "Agent")
+            transcript.append(f"{speaker}: {message.content}")
+        history.add_user_message("\n\n".join(transcript))
+
+        try:
+            # Imported here so importing this module does not configure the chat service
+            from utils.service_factory import get_chat_service
+
+            settings = AzureChatPromptExecutionSettings(max_tokens=self.summary_max_tokens, temperature=0)
+            response = await get_chat_service().get_chat_message_content(history, settings)
+        except Exception as e:
+            # The window and token budget still bound the task; try again after the next turn
+            self.summary_failures += 1
+            print(f"History summary failed for session {state.session_id}: {e}")
+            return
+
+        if response is not None and response.content and response.content.strip():
+            state.set_summary(response.content.strip(), upto)
+            self.summaries += 1
+
+    def forget(self, session_id: str) -> None:
+        """Cancel a session's pending summary"""
+        task = self._tasks.pop(session_id, None)
+        if task is not None:
+            task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "enabled": self.enabled,
+            "window_messages": self.window_messages,
+            "block_messages": self.block_messages,
+            "default_budget": self.default_budget,
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "pending_summaries": len(self._tasks),
+            "trimmed_messages": self.trimmed_messages
+        }
+
+
+# Global instance
+history_manager = HistoryManager()
@@ -0,0 +1,161 @@
+"""
+Intent router for Contoso Agent Demo
+Local TF-IDF classifier that sends clear single-intent messages straight to a specialist, skipping the triage LLM hop
+"""
+
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from data.intent_examples import INTENT_EXAMPLES
+
+TRIAGE_LABEL = "Alex"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Boundaries between independent requests in one message ("...high? And what pass should I buy")
+CLAUSE_PATTERN = re.compile(r"[?;.!]|\b(?:and also|also|and|plus|then)\b", re.IGNORECASE)
+# Words too common in customer messages to say anything about intent
+STOP_WORDS = {
+    "a", "an", "and", "are", "be", "can", "do", "for", "i", "im", "in", "is", "it", "me",
+    "my", "of", "on", "please", "the", "this", "to", "what", "you", "your", "with", "was", "s"
+}
+
+
+def _stem(word: str) -> str:
+    """Very light suffix stripping so "charges"/"charged"/"charge" share a feature"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed unigrams plus adjacent-word bigrams"""
+    words = [_stem(w) for w in TOKEN_PATTERN.findall(text.lower()) if w not in STOP_WORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class IntentRouter:
+    """
+    Picks the first agent for a customer message without an LLM call
+
+    Each agent is represented by the TF-IDF centroid of its example
+    utterances (data/intent_examples.py); a message goes to the agent with
+    the most similar centroid. It routes to a specialist only when that
+    similarity clears INTENT_ROUTER_MIN_SCORE and beats the runner-up by
+    INTENT_ROUTER_MIN_MARGIN; anything else - greetings, follow-ups,
+    multi-intent requests - still goes to Alex.
+    """
+
+    def __init__(self, examples: Dict[str, List[str]] = None):
+        self.enabled = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+        self.min_score = float(os.getenv("INTENT_ROUTER_MIN_SCORE", "0.15"))
+        self.min_margin = float(os.getenv("INTENT_ROUTER_MIN_MARGIN", "0.05"))
+
+        self._idf: Dict[str, float] = {}
+        self._centroids: Dict[str, Dict[str, float]] = {}
+        self.fit(examples or INTENT_EXAMPLES)
+
+        self._lock = threading.Lock()
+        self._routes: Counter = Counter()
+        self._total_seconds = 0.0
+
+    def fit(self, examples: Dict[str, List[str]]) -> None:
+        """Build IDF weights and one normalised centroid per label"""
+        documents = [(label, tokenize(text)) for label, texts in examples.items() for text in texts]
+        document_frequency = Counter(term for _, terms in documents for term in set(terms))
+        total = len(documents)
+        self._idf = {term: math.log((1 + total) / (1 + count)) + 1 for term, count in document_frequency.items()}
+
+        centroids: Dict[str, Counter] = {}
+        for label, terms in documents:
+            centroid = centroids.setdefault(label, Counter())
+            for term, weight in self._vector(terms).items():
+                centroid[term] += weight
+        self._centroids = {label: self._normalise(centroid) for label, centroid in centroids.items()}
+
+    def _vector(self, terms: List[str]) -> Dict[str, float]:
+        counts = Counter(term for term in terms if term in self._idf)
+        return self._normalise({term: count * self._idf[term] for term, count in counts.items()})
+
+    @staticmethod
+    def _normalise(vector: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {term: v / norm for term, v in vector.items()} if norm else {}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Cosine similarity of the message to each label, highest first"""
+        vector = self._vector(tokenize(text))
+        similarity = {
+            label: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+            for label, centroid in self._centroids.items()
+        }
+        return dict(sorted(similarity.items(), key=lambda item: item[1], reverse=True))
+
+    def classify(self, text: str) -> Tuple[str, float, float]:
+        """Best label, its score and its margin over the runner-up"""
+        ranked = list(self.scores(text).items())
+        if not ranked:
+            return TRIAGE_LABEL, 0.0, 0.0
+        label, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return label, best, best - runner_up
+
+    def route(self, text: str) -> Optional[str]:
+        """
+        Specialist to send the message to, or None to go through triage
+
+        Returns:
+            Agent name when the classifier is confident, else None
+        """
+        if not self.enabled:
+            return None
+        started = time.perf_counter()
+        label, score, margin = self.classify(text)
+        confident = label != TRIAGE_LABEL and score >= self.min_score and margin >= self.min_margin
+        if confident and len(self.sub_intents(text)) > 1:
+            # Several specialists are needed; triage (or the fan-out) coordinates them
+            confident = False
+        with self._lock:
+            self._total_seconds += time.perf_counter() - started
+            self._routes[label if confident else TRIAGE_LABEL] += 1
+        return label if confident else None
+
+    def sub_intents(self, text: str) -> List[Tuple[str, str]]:
+        """
+        Split a message into the parts each specialist should answer
+
+        Clauses are classified on their own; clauses confidently belonging to
+        the same specialist are joined. Clauses nobody is confident about are
+        left out, so a message with one clear intent yields a single entry.
+
+        Returns:
+            (agent name, text for that agent) in the order the intents appear
+        """
+        parts: Dict[str, List[str]] = {}
+        for clause in CLAUSE_PATTERN.split(text):
+            clause = clause.strip(" ,")
+            if not tokenize(clause):
+                continue
+            label, score, margin = self.classify(clause)
+            if label != TRIAGE_LABEL and score >= self.min_score and margin >= self.min_margin:
+                parts.setdefault(label, []).append(clause)
+        return [(label, "; ".join(clauses)) for label, clauses in parts.items()]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            decisions = sum(self._routes.values())
+            return {
+                "enabled": self.enabled,
+                "min_score": self.min_score,
+                "min_margin": self.min_margin,
+                "routes": dict(self._routes),
+                "avg_classify_ms": round(self._total_seconds / decisions * 1000, 3) if decisions else 0.0
+            }
+
+
+# Global instance
+intent_router = IntentRouter()
@@ -0,0 +1,151 @@
+"""
+Outbound WebSocket queue for Contoso Agent Demo
+One bounded queue per session drained by a single writer, so frames keep their order
+and a slow client applies backpressure instead of growing buffers without limit
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket
+
+
+class OutboundQueue:
+    """
+    Bounded, ordered send queue for one WebSocket
+
+    The overflow policy applies to frames queued with put(). Control replies
+    sent from the receive loop (pong, turn_cancelled) go through put_control(),
+    which never waits for space, so a slow client cannot stall the loop that
+    reads its cancel messages.
+    """
+
+    POLICIES = ("block", "drop_working", "disconnect")
+    # Progress frames that can be dropped under pressure without losing content
+    DROPPABLE_TYPES = {"agent_working"}
+    # Close code used when the client cannot keep up (RFC 6455: try again later)
+    OVERFLOW_CLOSE_CODE = 1013
+
+    def __init__(self, websocket: WebSocket, maxsize: int = None, policy: str = None):
+        self.websocket = websocket
+        self.maxsize = maxsize or int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+        self.policy = policy or os.getenv("WS_OVERFLOW_POLICY", "block")
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy '{self.policy}', expected one of {self.POLICIES}")
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        # Free slots for put() frames; control frames are queued without one
+        self._space = asyncio.Semaphore(self.maxsize)
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+
+        # Metrics
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._total_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self) -> None:
+        """Start the writer coroutine"""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._drain())
+
+    async def put(self, frame: Dict[str, Any]) -> None:
+        """
+        Queue a frame for sending, applying the overflow policy when the queue is full
+
+        Args:
+            frame: JSON-serialisable message for the client
+        """
+        if self._closed:
+            return
+
+        if self._space.locked():
+            if self.policy == "drop_working" and frame.get("type") in self.DROPPABLE_TYPES:
+                self.dropped += 1
+                return
+            if self.policy == "disconnect":
+                print(f"Outbound queue full ({self.maxsize} frames), disconnecting slow client")
+                await self.close(drain=False)
+                try:
+                    await self.websocket.close(code=self.OVERFLOW_CLOSE_CODE)
+                except Exception:
+                    pass
+                return
+
+        # Blocks the producer (the agent callback) until the client catches up
+        await self._space.acquire()
+        if self._closed:
+            # Pass the slot on so other blocked producers also return
+            self._space.release()
+            return
+        self._enqueue(frame, counted=True)
+
+    def put_control(self, frame: Dict[str, Any]) -> None:
+        """
+        Queue a control reply without waiting, in order with the other frames
+
+        Control frames are few and small, so they may take the queue briefly
+        past maxsize rather than block the caller.
+        """
+        if self._closed:
+            return
+        self._enqueue(frame, counted=False)
+
+    def _enqueue(self, frame: Dict[str, Any], counted: bool) -> None:
+        self._queue.put_nowait((frame, time.perf_counter(), counted))
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    async def _drain(self) -> None:
+        """Send queued frames one at a time, in order"""
+        while True:
+            frame, enqueued_at, counted = await self._queue.get()
+            try:
+                await self.websocket.send_text(json.dumps(frame))
+                latency = time.perf_counter() - enqueued_at
+                self.sent += 1
+                self._total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+            except Exception as e:
+                print(f"Error sending message: {e}")
+            finally:
+                self._queue.task_done()
+                if counted:
+                    self._space.release()
+
+    async def close(self, drain: bool = True, timeout: float = 5.0) -> None:
+        """Stop accepting frames and stop the writer, optionally flushing what is queued"""
+        self._closed = True
+        if self._writer is None:
+            return
+        if drain:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._writer.cancel()
+        self._writer = None
+
+        # Discard leftovers so producers blocked on a full queue can return
+        while not self._queue.empty():
+            _, _, counted = self._queue.get_nowait()
+            self._queue.task_done()
+            if counted:
+                self._space.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and send latency for this session"""
+        return {
+            "policy": self.policy,
+            "depth": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "capacity": self.maxsize,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "avg_send_latency_ms": round(self._total_latency / self.sent * 1000, 2) if self.sent else 0.0,
+            "max_send_latency_ms": round(self.max_latency * 1000, 2)
+        }
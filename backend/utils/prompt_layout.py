@@ -0,0 +1,65 @@
+"""
+Prompt layout for Contoso Agent Demo
+Keeps every LLM request's prefix (instructions, tool schemas, earlier history) byte-identical across turns
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from semantic_kernel.contents import ChatMessageContent
+
+# Providers only cache prompt prefixes past a minimum length (1024 tokens for OpenAI/Azure OpenAI)
+MIN_CACHEABLE_TOKENS = 1024
+
+
+def stable_text(text: str) -> str:
+    """
+    Normalise static prompt text (agent instructions, handoff descriptions)
+
+    Line endings and trailing whitespace depend on how a file was edited, and
+    any byte that changes breaks the cached prefix for everything after it.
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def canonical_message(message: ChatMessageContent) -> ChatMessageContent:
+    """
+    Plain-text copy of a delivered agent reply for the session history
+
+    Replies reach the session either as an assembled stream or as the agent's
+    own message, which also carries metadata and content items. Keeping only
+    role, author name and text means a reply is serialised the same way on
+    every later turn, whichever path delivered it.
+    """
+    return ChatMessageContent(role=message.role, name=message.name, content=stable_text(message.content or ""))
+
+
+def request_layout(body: Dict[str, Any]) -> List[str]:
+    """
+    Split a chat completions request into its prompt segments in cache order
+
+    Segments are the system messages, then the tool schemas, then each
+    remaining message, each serialised canonically, so two requests can be
+    compared segment by segment.
+    """
+    messages = body.get("messages", [])
+    system = [m for m in messages if m.get("role") in ("system", "developer")]
+    rest = [m for m in messages if m.get("role") not in ("system", "developer")]
+    segments = [json.dumps(m, sort_keys=True, ensure_ascii=False) for m in system]
+    if body.get("tools"):
+        segments.append(json.dumps(body["tools"], sort_keys=True, ensure_ascii=False))
+    segments.extend(json.dumps(m, sort_keys=True, ensure_ascii=False) for m in rest)
+    return segments
+
+
+def shared_prefix_bytes(previous: Optional[List[str]], current: List[str]) -> int:
+    """Bytes at the start of current that repeat previous exactly, counted in whole segments"""
+    if not previous:
+        return 0
+    shared = 0
+    for before, after in zip(previous, current):
+        if before != after:
+            break
+        shared += len(after.encode("utf-8"))
+    return shared
@@ -0,0 +1,169 @@
+"""
+Runtime management for Contoso Agent Demo
+Multiplexes orchestrations from many sessions onto a small, bounded set of InProcessRuntimes
+"""
+
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Set
+
+from semantic_kernel.agents.runtime import InProcessRuntime
+
+
+class RuntimeHandle:
+    """A started runtime plus the bookkeeping needed to retire it safely"""
+
+    def __init__(self):
+        self.runtime = InProcessRuntime()
+        self.runtime.start()
+        self.in_flight = 0
+        self.invocations = 0
+
+    def queue_depth(self) -> int:
+        """Messages waiting to be processed by this runtime"""
+        count = getattr(self.runtime, "unprocessed_messages_count", None)
+        if count is not None:
+            return count
+        queue = getattr(self.runtime, "_message_queue", None)
+        return queue.qsize() if queue is not None else 0
+
+
+class RuntimeSlot:
+    """One shard of the runtime set; sessions are pinned to a slot"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.current = RuntimeHandle()
+        self.retiring: List[RuntimeHandle] = []
+        self.sessions: Set[str] = set()
+
+
+class RuntimeManager:
+    """
+    Shared runtimes keyed by session_id
+
+    Each session is pinned to the least loaded slot when it connects. Agent actors
+    registered by finished orchestrations are never unregistered by the runtime, so
+    a slot swaps in a fresh runtime after a configurable number of invocations and
+    stops the old one once its in-flight turns have drained.
+    """
+
+    def __init__(self, size: int = None, recycle_after: int = None):
+        self.size = size or int(os.getenv("RUNTIME_POOL_SIZE", "1"))
+        self.recycle_after = recycle_after or int(os.getenv("RUNTIME_RECYCLE_AFTER", "500"))
+
+        self._slots: List[RuntimeSlot] = []
+        self._session_slots: Dict[str, RuntimeSlot] = {}
+        self._active_results: Dict[str, Set[Any]] = {}
+
+    def start(self) -> None:
+        """Start the shared runtimes"""
+        if self._slots:
+            return
+        self._slots = [RuntimeSlot(index) for index in range(self.size)]
+        print(f"🚀 Started {self.size} shared agent runtime(s)")
+
+    async def stop(self) -> None:
+        """Stop every runtime once it has no queued work"""
+        for slot in self._slots:
+            for handle in [slot.current, *slot.retiring]:
+                await handle.runtime.stop_when_idle()
+        self._slots = []
+        self._session_slots.clear()
+        self._active_results.clear()
+
+    def attach(self, session_id: str) -> None:
+        """Pin a session to the least loaded runtime slot"""
+        if not self._slots:
+            raise RuntimeError("Runtime manager has not been started")
+        if session_id in self._session_slots:
+            return
+        slot = min(self._slots, key=lambda s: (len(s.sessions), s.current.in_flight))
+        slot.sessions.add(session_id)
+        self._session_slots[session_id] = slot
+
+    @asynccontextmanager
+    async def turn(self, session_id: str) -> AsyncIterator[InProcessRuntime]:
+        """
+        Reserve the session's runtime for one orchestration invocation
+
+        Yields:
+            The runtime to pass to orchestration.invoke
+        """
+        self.attach(session_id)
+        slot = self._session_slots[session_id]
+        handle = slot.current
+        handle.in_flight += 1
+        handle.invocations += 1
+        try:
+            yield handle.runtime
+        except BaseException:
+            # Timed out, cancelled or failed - stop the orchestration from doing more work
+            self._cancel_results(session_id)
+            raise
+        finally:
+            handle.in_flight -= 1
+            self._active_results.pop(session_id, None)
+            await self._maybe_recycle(slot, handle)
+
+    def track(self, session_id: str, orchestration_result: Any) -> None:
+        """Remember an in-flight orchestration so it can be cancelled on disconnect"""
+        self._active_results.setdefault(session_id, set()).add(orchestration_result)
+
+    async def release(self, session_id: str) -> None:
+        """Cancel the session's in-flight orchestrations and forget the session"""
+        self._cancel_results(session_id)
+
+        slot = self._session_slots.pop(session_id, None)
+        if slot is not None:
+            slot.sessions.discard(session_id)
+
+    def _cancel_results(self, session_id: str) -> None:
+        """Cancel tracked orchestration results for a session"""
+        for orchestration_result in self._active_results.pop(session_id, set()):
+            try:
+                orchestration_result.cancel()
+            except RuntimeError:
+                # Already completed or cancelled
+                pass
+
+    async def _maybe_recycle(self, slot: RuntimeSlot, handle: RuntimeHandle) -> None:
+        """Swap in a fresh runtime when the current one has served enough turns"""
+        if handle is slot.current and handle.invocations >= self.recycle_after:
+            slot.retiring.append(handle)
+            slot.current = RuntimeHandle()
+
+        for retired in [h for h in slot.retiring if h.in_flight == 0]:
+            slot.retiring.remove(retired)
+            await retired.runtime.stop_when_idle()
+
+    def queue_depth(self) -> int:
+        """Total messages queued across all runtimes"""
+        return sum(
+            handle.queue_depth()
+            for slot in self._slots
+            for handle in [slot.current, *slot.retiring]
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-runtime load and queue depth"""
+        return {
+            "size": self.size,
+            "sessions": len(self._session_slots),
+            "queue_depth": self.queue_depth(),
+            "slots": [
+                {
+                    "index": slot.index,
+                    "sessions": len(slot.sessions),
+                    "in_flight": slot.current.in_flight,
+                    "invocations": slot.current.invocations,
+                    "queue_depth": slot.current.queue_depth(),
+                    "retiring": len(slot.retiring)
+                }
+                for slot in self._slots
+            ]
+        }
+
+
+# Global instance
+runtime_manager = RuntimeManager()
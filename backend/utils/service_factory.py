@@ -0,0 +1,180 @@
+"""
+Chat service factory for Contoso Agent Demo
+Creates one AzureChatCompletion per process backed by a pooled, keep-alive HTTP client
+"""
+
+import asyncio
+import os
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncAzureOpenAI
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+
+
+class LeaseTransport(httpx.AsyncBaseTransport):
+    """
+    Transport for one agent pool slot, sending requests over the shared connection pool
+
+    Remembers the tasks that sent requests while the slot was leased, so an
+    abandoned turn can cancel them - aborting their in-flight requests and
+    returning the connections to the pool - and refuses requests while the
+    slot is not leased, so an agent left over from that turn cannot start
+    another LLM call.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self._tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+        self.open = False
+
+    def begin(self) -> None:
+        """Accept requests for a new lease"""
+        self._tasks = weakref.WeakSet()
+        self.open = True
+
+    def end(self) -> None:
+        """Refuse further requests until the next lease"""
+        self.open = False
+
+    def abort(self) -> set:
+        """
+        Stop accepting requests and cancel every task that sent one during the lease
+
+        Returns:
+            The cancelled tasks, so the caller can wait for them to unwind
+        """
+        self.open = False
+        current = asyncio.current_task()
+        cancelled = {task for task in self._tasks if not task.done() and task is not current}
+        for task in cancelled:
+            task.cancel()
+        return cancelled
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.open:
+            raise httpx.ConnectError("Agent pool slot is not leased", request=request)
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks.add(task)
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # The shared connection pool is closed by the factory
+        pass
+
+
+class ChatServiceFactory:
+    """Builds and shares the Azure OpenAI chat service and its HTTP connection pool"""
+
+    def __init__(self):
+        self.max_connections = int(os.getenv("AZURE_OPENAI_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = int(os.getenv("AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.keepalive_expiry = float(os.getenv("AZURE_OPENAI_KEEPALIVE_EXPIRY", "120"))
+        self.timeout = float(os.getenv("AZURE_OPENAI_TIMEOUT", "60"))
+        self.http2 = os.getenv("AZURE_OPENAI_HTTP2", "true").lower() == "true"
+
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._service: Optional[AzureChatCompletion] = None
+        self._lease_clients: "weakref.WeakSet[httpx.AsyncClient]" = weakref.WeakSet()
+
+    def get_service(self) -> AzureChatCompletion:
+        """Return the shared chat service, creating it on first use"""
+        if self._service is None:
+            self._service = self._build_service(self._get_http_client())
+        return self._service
+
+    def create_lease_service(self) -> Tuple[AzureChatCompletion, LeaseTransport]:
+        """
+        Chat service for one agent pool slot
+
+        The slot gets its own client, but its requests use the shared
+        connection pool, so connections are still reused across slots.
+
+        Returns:
+            The service and the transport that gates and aborts its requests
+        """
+        transport = LeaseTransport(self._get_transport())
+        client = httpx.AsyncClient(transport=transport, timeout=self._timeout())
+        self._lease_clients.add(client)
+        return self._build_service(client), transport
+
+    def _build_service(self, http_client: httpx.AsyncClient) -> AzureChatCompletion:
+        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+        api_key = os.getenv("AZURE_OPENAI_API_KEY")
+        api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+
+        client = AsyncAzureOpenAI(
+            azure_endpoint=endpoint,
+            api_key=api_key,
+            api_version=api_version,
+            http_client=http_client
+        )
+        return AzureChatCompletion(
+            deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
+            endpoint=endpoint,
+            api_key=api_key,
+            api_version=api_version,
+            async_client=client
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=10.0)
+
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        """Create the connection pool shared by every request to Azure OpenAI"""
+        if self._transport is None:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
+            try:
+                self._transport = httpx.AsyncHTTPTransport(limits=limits, http2=self.http2)
+            except ImportError:
+                # HTTP/2 needs the optional 'h2' package (pip install "httpx[http2]")
+                print("Warning: HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+                self.http2 = False
+                self._transport = httpx.AsyncHTTPTransport(limits=limits)
+        return self._transport
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Create the pooled HTTP client shared by every request to Azure OpenAI"""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(transport=self._get_transport(), timeout=self._timeout())
+        return self._http_client
+
+    async def aclose(self) -> None:
+        """Close pooled connections; the next get_service call starts a new pool"""
+        for client in list(self._lease_clients):
+            await client.aclose()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        elif self._transport is not None:
+            await self._transport.aclose()
+        self._lease_clients = weakref.WeakSet()
+        self._transport = None
+        self._http_client = None
+        self._service = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection pool configuration"""
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+            "client_open": self._transport is not None,
+            "lease_clients": len(self._lease_clients)
+        }
+
+
+# Global instance
+chat_service_factory = ChatServiceFactory()
+
+
+def get_chat_service() -> AzureChatCompletion:
+    """Shared chat service used by the web server and the terminal demo"""
+    return chat_service_factory.get_service()
@@ -0,0 +1,56 @@
+"""
+Per-session conversation state for Contoso Agent Demo
+Holds only what belongs to one WebSocket session - agents and orchestrations are shared
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from semantic_kernel.contents import ChatMessageContent, AuthorRole
+
+from utils.prompt_layout import canonical_message
+
+
+class SessionState:
+    """Lightweight conversation state owned by a single session"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.history: List[ChatMessageContent] = []
+        self.created_at = datetime.now()
+        self.last_active = self.created_at
+        self.turns = 0
+        # Running summary of history[:summarized_upto] (see utils.history_manager)
+        self.summary: Optional[str] = None
+        self.summarized_upto = 0
+        # history[:trimmed_upto] has been left out of a task to fit the token budget
+        self.trimmed_upto = 0
+
+    def add_user_message(self, content: str) -> ChatMessageContent:
+        """Record a customer message and start a new turn"""
+        message = ChatMessageContent(role=AuthorRole.USER, content=content)
+        self.history.append(message)
+        self.turns += 1
+        self.last_active = datetime.now()
+        return message
+
+    def add_agent_message(self, message: ChatMessageContent) -> None:
+        """Record an agent reply that was delivered to the customer"""
+        if not message.content or not message.content.strip():
+            return
+        # Stored as plain text so the history prefix is byte-identical on every later turn
+        self.history.append(canonical_message(message))
+        self.last_active = datetime.now()
+
+    def get_task(self) -> List[ChatMessageContent]:
+        """
+        Build the orchestration task for the current turn
+
+        Returns a copy so agents never mutate the session history in place
+        """
+        return list(self.history)
+
+    def set_summary(self, summary: str, upto: int) -> None:
+        """Replace the running summary, which now covers the first `upto` messages"""
+        self.summary = summary
+        self.summarized_upto = upto
@@ -0,0 +1,124 @@
+"""
+Specialist fan-out for Contoso Agent Demo
+Runs the specialists for independent parts of a multi-intent message concurrently and merges their replies
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+
+from utils.intent_router import intent_router
+
+FOCUS_NOTE = (
+    "The customer's latest message covers several topics, and other specialists are answering "
+    "the rest at the same time. Answer only this part: {part}\n"
+    "Do not hand off or mention other topics; reply directly to the customer."
+)
+REFERENCE_PATTERN = re.compile(r"\[FILE:[^\]]+\]|\[WIDGET:[^:\]]+:\[[^\]]*\]\]")
+
+
+class SpecialistFanOut:
+    """
+    Answers multi-intent messages with several specialists at once
+
+    The handoff orchestration runs one agent at a time, so "why is my bill
+    high and what roaming pass should I buy" costs a BillingAgent turn
+    followed by a PlanAgent turn. When the intent router finds independent
+    parts for two or more specialists, each specialist from the leased pool
+    slot is invoked directly on its part, concurrently, and the replies are
+    merged into one message with file and widget references kept (and
+    de-duplicated).
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("FAN_OUT_ENABLED", "true").lower() == "true"
+        self.max_agents = int(os.getenv("FAN_OUT_MAX_AGENTS", "3"))
+
+        # Metrics
+        self.fan_outs = 0
+        self.agent_failures = 0
+        self.total_seconds = 0.0
+
+    def plan(self, text: str) -> List[Tuple[str, str]]:
+        """(agent name, part of the message) for each specialist, or [] when one agent suffices"""
+        if not self.enabled:
+            return []
+        parts = intent_router.sub_intents(text)
+        return parts[:self.max_agents] if len(parts) > 1 else []
+
+    async def run(self, agents: Dict[str, ChatCompletionAgent], plan: List[Tuple[str, str]],
+                  task: List[ChatMessageContent],
+                  on_intermediate_message: Optional[Callable[[ChatMessageContent], Any]] = None,
+                  name: str = "Alex") -> ChatMessageContent:
+        """
+        Invoke the planned specialists concurrently and merge their replies
+
+        Args:
+            agents: Agents by name (one pool slot's agents from create_contoso_agents)
+            plan: Output of plan()
+            task: Conversation messages for this turn, ending with the customer's message
+            on_intermediate_message: Receives tool call/result messages while agents work
+            name: Author name of the merged reply
+
+        Returns:
+            One assistant message combining every specialist's answer
+        """
+        started = time.perf_counter()
+        replies = await asyncio.gather(
+            *(self._ask(agents[agent_name], part, task, on_intermediate_message) for agent_name, part in plan),
+            return_exceptions=True
+        )
+        self.fan_outs += 1
+        self.total_seconds += time.perf_counter() - started
+
+        answers = []
+        for (agent_name, _), reply in zip(plan, replies):
+            if isinstance(reply, BaseException):
+                self.agent_failures += 1
+                print(f"Fan-out: {agent_name} failed: {reply}")
+                continue
+            if reply:
+                answers.append(reply)
+        if not answers:
+            raise RuntimeError("No specialist could answer the request")
+        return ChatMessageContent(role=AuthorRole.ASSISTANT, name=name, content=self.merge(answers))
+
+    async def _ask(self, agent: ChatCompletionAgent, part: str, task: List[ChatMessageContent],
+                   on_intermediate_message: Optional[Callable[[ChatMessageContent], Any]]) -> str:
+        messages = list(task) + [ChatMessageContent(role=AuthorRole.SYSTEM, content=FOCUS_NOTE.format(part=part))]
+        content = ""
+        async for response in agent.invoke(messages=messages, on_intermediate_message=on_intermediate_message):
+            if response.message.content:
+                content = response.message.content
+        return content.strip()
+
+    @staticmethod
+    def merge(answers: List[str]) -> str:
+        """Join answers in plan order, dropping file/widget references an earlier answer already showed"""
+        seen = set()
+        merged = []
+        for answer in answers:
+            def keep_first(match: re.Match) -> str:
+                if match.group(0) in seen:
+                    return ""
+                seen.add(match.group(0))
+                return match.group(0)
+            merged.append(REFERENCE_PATTERN.sub(keep_first, answer).strip())
+        return "\n\n".join(answer for answer in merged if answer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "fan_outs": self.fan_outs,
+            "agent_failures": self.agent_failures,
+            "avg_seconds": round(self.total_seconds / self.fan_outs, 3) if self.fan_outs else 0.0
+        }
+
+
+# Global instance
+specialist_fan_out = SpecialistFanOut()
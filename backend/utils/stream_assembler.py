@@ -0,0 +1,77 @@
+"""
+Streaming text assembly for Contoso Agent Demo
+Releases token chunks to the client without ever splitting a [FILE:...] or [WIDGET:...] marker
+"""
+
+import re
+from typing import Optional
+
+
+class MarkerSafeStream:
+    """
+    Accumulates streamed chunks of one agent message
+
+    Text is released as soon as it cannot be part of an unfinished marker. A marker
+    split across chunks (e.g. "[WID" + "GET:addons:[\"ADDON-DATA-10\"]]") is held back
+    until it closes, so deltas never contain half a marker.
+    """
+
+    MARKER_PREFIXES = ("[FILE:", "[WIDGET:")
+    # Same shapes as FileManager/WidgetManager extraction patterns
+    MARKER_PATTERN = re.compile(r'\[FILE:[^:\]]+:[^\]]+\]|\[WIDGET:[^:]+:\[[^\]]*\]\]')
+    # An opened marker longer than this is treated as plain text
+    MAX_MARKER_LENGTH = 512
+
+    def __init__(self, stream_id: str, agent: str):
+        self.stream_id = stream_id
+        self.agent = agent
+        self._text = ""
+        self._released = 0
+
+    @property
+    def content(self) -> str:
+        """Everything received so far"""
+        return self._text
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk and return the text that is now safe to send
+
+        Returns:
+            New text since the last release (may be empty)
+        """
+        if chunk:
+            self._text += chunk
+        hold_at = self._find_hold_position()
+        end = len(self._text) if hold_at is None else hold_at
+        delta = self._text[self._released:end]
+        self._released = end
+        return delta
+
+    def finish(self) -> str:
+        """Release whatever is still held back at the end of the message"""
+        delta = self._text[self._released:]
+        self._released = len(self._text)
+        return delta
+
+    def _find_hold_position(self) -> Optional[int]:
+        """Index of the first possibly-unfinished marker after the released text"""
+        position = self._text.find("[", self._released)
+        while position != -1:
+            complete = self.MARKER_PATTERN.match(self._text, position)
+            if complete:
+                position = self._text.find("[", complete.end())
+                continue
+
+            tail = self._text[position:]
+            if len(tail) <= self.MAX_MARKER_LENGTH and self._could_be_marker(tail):
+                return position
+            position = self._text.find("[", position + 1)
+        return None
+
+    def _could_be_marker(self, tail: str) -> bool:
+        """True if the tail is a marker prefix or an opened marker still waiting to close"""
+        for prefix in self.MARKER_PREFIXES:
+            if prefix.startswith(tail) or tail.startswith(prefix):
+                return True
+        return False
@@ -0,0 +1,160 @@
+"""
+Tool result cache for Contoso Agent Demo
+TTL + LRU cache for deterministic, read-only kernel functions, keyed by function name and arguments
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class ToolResultCache:
+    """
+    Caches tool outputs so repeated calls skip rebuilding and re-serialising data
+
+    Use as a decorator underneath @kernel_function:
+
+        @kernel_function(name="get_current_plan", description="...")
+        @tool_cache.cached(ttl=300)
+        def get_current_plan(self) -> Annotated[str, "..."]:
+            ...
+    """
+
+    def __init__(self, max_entries: int = None, default_ttl: float = None):
+        self.max_entries = max_entries or int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "512"))
+        self.default_ttl = default_ttl if default_ttl is not None else float(os.getenv("TOOL_CACHE_TTL_SECONDS", "300"))
+        self.enabled = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        # Tools may run on worker threads, so guard the shared structures
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._invalidation_hooks: Dict[str, List[Callable[[str], None]]] = {}
+
+    def cached(self, ttl: Optional[float] = None, name: Optional[str] = None) -> Callable:
+        """
+        Decorator that caches a function's return value
+
+        Args:
+            ttl: Seconds an entry stays valid (defaults to TOOL_CACHE_TTL_SECONDS)
+            name: Cache name used for stats and invalidation (defaults to Class.method)
+        """
+        def decorator(func: Callable) -> Callable:
+            function_name = name or func.__qualname__
+            signature = inspect.signature(func)
+            entry_ttl = self.default_ttl if ttl is None else ttl
+
+            def make_key(args, kwargs) -> Tuple[str, str]:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = {k: v for k, v in bound.arguments.items() if k != "self"}
+                return function_name, json.dumps(arguments, sort_keys=True, default=str)
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    key = make_key(args, kwargs)
+                    hit, value = self.get(key)
+                    if hit:
+                        return value
+                    value = await func(*args, **kwargs)
+                    self.set(key, value, entry_ttl)
+                    return value
+                wrapper = async_wrapper
+            else:
+                @functools.wraps(func)
+                def sync_wrapper(*args, **kwargs):
+                    key = make_key(args, kwargs)
+                    hit, value = self.get(key)
+                    if hit:
+                        return value
+                    value = func(*args, **kwargs)
+                    self.set(key, value, entry_ttl)
+                    return value
+                wrapper = sync_wrapper
+
+            wrapper.cache_name = function_name
+            wrapper.cache_invalidate = lambda: self.invalidate(function_name)
+            with self._lock:
+                self._stats.setdefault(function_name, {"hits": 0, "misses": 0, "evictions": 0})
+            return wrapper
+
+        return decorator
+
+    def get(self, key: Tuple[str, str]) -> Tuple[bool, Any]:
+        """Look up a cached value, returning (hit, value)"""
+        function_name = key[0]
+        with self._lock:
+            stats = self._stats.setdefault(function_name, {"hits": 0, "misses": 0, "evictions": 0})
+            if not self.enabled:
+                stats["misses"] += 1
+                return False, None
+
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                stats["misses"] += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            stats["hits"] += 1
+            return True, entry[1]
+
+    def set(self, key: Tuple[str, str], value: Any, ttl: float) -> None:
+        """Store a value, evicting the least recently used entries beyond max_entries"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._stats[evicted_key[0]]["evictions"] += 1
+
+    def invalidate(self, function_name: Optional[str] = None) -> int:
+        """
+        Drop cached entries for one function, or everything when no name is given
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [k for k in self._entries if function_name is None or k[0] == function_name]
+            for key in keys:
+                del self._entries[key]
+            names = [function_name] if function_name else list(self._invalidation_hooks)
+            hooks = [hook for n in names for hook in self._invalidation_hooks.get(n, [])]
+
+        for hook in hooks:
+            hook(function_name)
+        return len(keys)
+
+    def on_invalidate(self, function_name: str, hook: Callable[[str], None]) -> None:
+        """Register a callback to run whenever a function's cache is invalidated"""
+        with self._lock:
+            self._invalidation_hooks.setdefault(function_name, []).append(hook)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per function for tuning TTLs and sizes"""
+        with self._lock:
+            per_function = {name: dict(counts) for name, counts in self._stats.items()}
+            entries = len(self._entries)
+        hits = sum(c["hits"] for c in per_function.values())
+        misses = sum(c["misses"] for c in per_function.values())
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "functions": per_function
+        }
+
+
+# Global instance
+tool_cache = ToolResultCache()
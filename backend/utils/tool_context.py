@@ -0,0 +1,19 @@
+"""
+Tool context for Contoso Agent Demo
+Per-orchestration state that tools read to know which session they are serving
+"""
+
+from typing import Optional
+
+
+class ToolContext:
+    """
+    Mutable context shared by the tool plugins of one pooled orchestration
+
+    Tools execute inside runtime tasks, where context variables set by the
+    WebSocket handler are not visible. Each pooled orchestration instead owns one
+    ToolContext, and the pool sets its session_id for the duration of a lease.
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id
@@ -0,0 +1,190 @@
+"""
+Tool executor for Contoso Agent Demo
+Runs blocking tool work on worker pools so the event loop keeps serving other sessions
+"""
+
+import asyncio
+import contextvars
+import functools
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Functions that may run in the process pool, keyed by "module:qualname" so worker
+# processes can find them again after importing the module
+_PROCESS_FUNCTIONS: Dict[str, Callable] = {}
+
+
+def _timed_call(func: Callable, args: tuple, kwargs: dict) -> Tuple[Any, float, float]:
+    """Run a function on a worker, returning its result with start/end timestamps"""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, started, time.perf_counter()
+
+
+def _process_trampoline(key: str, args: tuple, kwargs: dict) -> Tuple[Any, float, float]:
+    """Entry point in a worker process: resolve the registered function and run it"""
+    if key not in _PROCESS_FUNCTIONS:
+        importlib.import_module(key.split(":", 1)[0])
+    return _timed_call(_PROCESS_FUNCTIONS[key], args, kwargs)
+
+
+class ToolExecutor:
+    """
+    Dispatches tool functions to I/O or CPU worker pools and records per-tool timings
+
+    Mark a synchronous tool underneath @kernel_function (and under @tool_cache.cached
+    so cache hits stay on the event loop):
+
+        @kernel_function(name="analyze_high_charges", description="...")
+        @tool_cache.cached()
+        @tool_executor.offload("cpu")
+        def analyze_high_charges(self, bill_id: ...) -> ...:
+            ...
+
+    Kinds:
+        io      - file and network work, on a wide thread pool
+        cpu     - pandas/matplotlib work, on a small thread pool sized to the CPU
+        process - pure, picklable work, on a process pool (TOOL_PROCESS_WORKERS > 0);
+                  falls back to the cpu pool when no process pool is configured
+    """
+
+    KINDS = ("io", "cpu", "process")
+
+    def __init__(self, io_workers: int = None, cpu_workers: int = None, process_workers: int = None):
+        self.io_workers = io_workers or int(os.getenv("TOOL_IO_WORKERS", "16"))
+        self.cpu_workers = cpu_workers or int(os.getenv("TOOL_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.process_workers = process_workers if process_workers is not None else int(os.getenv("TOOL_PROCESS_WORKERS", "0"))
+        self.enabled = os.getenv("TOOL_EXECUTOR_ENABLED", "true").lower() == "true"
+
+        self._pools: Dict[str, Executor] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _pool(self, kind: str) -> Optional[Executor]:
+        """Create worker pools lazily so importing this module starts no threads or processes"""
+        if kind == "process" and self.process_workers <= 0:
+            kind = "cpu"
+        with self._lock:
+            pool = self._pools.get(kind)
+            if pool is None:
+                if kind == "process":
+                    pool = ProcessPoolExecutor(max_workers=self.process_workers)
+                else:
+                    workers = self.io_workers if kind == "io" else self.cpu_workers
+                    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"tool-{kind}")
+                self._pools[kind] = pool
+            return pool
+
+    async def run(self, kind: str, func: Callable, *args, name: str = None, **kwargs) -> Any:
+        """
+        Run a synchronous function on the pool for `kind` and await its result
+
+        Args:
+            kind: "io", "cpu" or "process"
+            func: Function to run; for "process" it must be registered via offload()
+            name: Name to record timings under (defaults to the function's qualname)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown tool kind '{kind}', expected one of {self.KINDS}")
+        name = name or func.__qualname__
+
+        if not self.enabled:
+            result, started, finished = _timed_call(func, args, kwargs)
+            self._record(name, kind, 0.0, finished - started, error=False)
+            return result
+
+        loop = asyncio.get_running_loop()
+        pool = self._pool(kind)
+        submitted = time.perf_counter()
+        if isinstance(pool, ProcessPoolExecutor):
+            key = f"{func.__module__}:{func.__qualname__}"
+            call = functools.partial(_process_trampoline, key, args, kwargs)
+        else:
+            # Keep context variables visible to the tool, as asyncio.to_thread does
+            context = contextvars.copy_context()
+            call = functools.partial(context.run, _timed_call, func, args, kwargs)
+
+        try:
+            result, started, finished = await loop.run_in_executor(pool, call)
+        except BaseException:
+            self._record(name, kind, 0.0, time.perf_counter() - submitted, error=True)
+            raise
+        self._record(name, kind, started - submitted, finished - started, error=False)
+        return result
+
+    def offload(self, kind: str = "io", name: str = None) -> Callable:
+        """
+        Decorator turning a synchronous tool into a coroutine that runs on a worker pool
+
+        Args:
+            kind: "io", "cpu" or "process"
+            name: Name for metrics (defaults to Class.method)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown tool kind '{kind}', expected one of {self.KINDS}")
+
+        def decorator(func: Callable) -> Callable:
+            tool_name = name or func.__qualname__
+            if kind == "process":
+                _PROCESS_FUNCTIONS[f"{func.__module__}:{func.__qualname__}"] = func
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await self.run(kind, func, *args, name=tool_name, **kwargs)
+
+            wrapper.executor_kind = kind
+            return wrapper
+
+        return decorator
+
+    def _record(self, name: str, kind: str, queue_wait: float, run_time: float, error: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                "kind": kind, "calls": 0, "errors": 0,
+                "queue_wait_total": 0.0, "queue_wait_max": 0.0,
+                "run_time_total": 0.0, "run_time_max": 0.0
+            })
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["queue_wait_total"] += queue_wait
+            stats["queue_wait_max"] = max(stats["queue_wait_max"], queue_wait)
+            stats["run_time_total"] += run_time
+            stats["run_time_max"] = max(stats["run_time_max"], run_time)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool sizes and per-tool queue-wait/run-time in milliseconds"""
+        with self._lock:
+            tools = {
+                name: {
+                    "kind": s["kind"],
+                    "calls": s["calls"],
+                    "errors": s["errors"],
+                    "avg_queue_wait_ms": round(s["queue_wait_total"] / s["calls"] * 1000, 2),
+                    "max_queue_wait_ms": round(s["queue_wait_max"] * 1000, 2),
+                    "avg_run_ms": round(s["run_time_total"] / s["calls"] * 1000, 2),
+                    "max_run_ms": round(s["run_time_max"] * 1000, 2)
+                }
+                for name, s in self._stats.items()
+            }
+        return {
+            "enabled": self.enabled,
+            "io_workers": self.io_workers,
+            "cpu_workers": self.cpu_workers,
+            "process_workers": self.process_workers,
+            "tools": tools
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop all worker pools"""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Global instance
+tool_executor = ToolExecutor()
@@ -0,0 +1,184 @@
+"""
+Tool output serialization for Contoso Agent Demo
+Compact, token-budgeted JSON for tool results sent back to the LLM
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# File and widget references are rendered by the frontend and must reach the model intact
+REFERENCE_PATTERN = re.compile(r"^\[(FILE|WIDGET):")
+# String lengths tried, in order, once list summaries alone do not fit the budget
+STRING_LIMITS = (400, 160, 60)
+
+
+def _parse_budgets(spec: str) -> Dict[str, int]:
+    """Parse "tool=tokens,tool=tokens" into a dict"""
+    budgets = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip().isdigit():
+            budgets[name.strip()] = int(value)
+    return budgets
+
+
+class ToolOutput:
+    """
+    Serializes tool payloads for the model
+
+    Output uses compact separators and drops null fields; empty lists,
+    objects and strings are kept so "none found" stays distinguishable from
+    a missing field. Lists of records with the same keys are sent as a table
+    ({"columns": [...], "rows": [[...]]}) so keys are not repeated per row.
+    When a result is over its tool's token budget, long lists are summarised
+    to their first items plus a count, then long strings are shortened,
+    until it fits.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("TOOL_OUTPUT_COMPACT", "true").lower() == "true"
+        self.tabular = os.getenv("TOOL_OUTPUT_TABULAR", "true").lower() == "true"
+        self.default_budget = int(os.getenv("TOOL_OUTPUT_MAX_TOKENS", "1500"))
+        self.budgets = _parse_budgets(os.getenv("TOOL_OUTPUT_BUDGETS", ""))
+        self.list_items = int(os.getenv("TOOL_OUTPUT_LIST_ITEMS", "20"))
+        self.preview_rows = int(os.getenv("TOOL_OUTPUT_PREVIEW_ROWS", "5"))
+
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # The encoding is downloaded on first use; estimate when offline
+                print(f"tiktoken unavailable, estimating tool output tokens: {e}")
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def count_tokens(self, text: str) -> int:
+        """Token count with tiktoken when installed, else the ~4 characters per token rule"""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def budget_for(self, tool: Optional[str]) -> int:
+        return self.budgets.get(tool, self.default_budget)
+
+    def dumps(self, payload: Any, tool: str = None, drop: Iterable[str] = (), budget: int = None) -> str:
+        """
+        Serialize a tool result
+
+        Args:
+            payload: JSON-serializable result
+            tool: Tool name, for its budget (TOOL_OUTPUT_BUDGETS) and stats
+            drop: Keys the model does not need, removed at any depth
+            budget: Token budget overriding the tool's configured one
+        """
+        if not self.enabled:
+            return json.dumps(payload, indent=2, default=str)
+
+        budget = budget or self.budget_for(tool)
+        pruned = self._prune(payload, set(drop))
+        text = self._encode(pruned)
+        tokens = self.count_tokens(text)
+        summarised = False
+
+        # Summary mode: shrink lists first (keeps every field of the items shown), then strings
+        max_items = self.list_items
+        string_limit = None
+        limits = iter(STRING_LIMITS)
+        while tokens > budget:
+            if max_items > 1:
+                max_items = max(1, max_items // 2)
+            else:
+                string_limit = next(limits, None)
+                if string_limit is None:
+                    break
+            text = self._encode(self._summarise(pruned, max_items, string_limit))
+            tokens = self.count_tokens(text)
+            summarised = True
+
+        self._record(tool, tokens, summarised, tokens > budget)
+        return text
+
+    def _encode(self, payload: Any) -> str:
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def _prune(self, value: Any, drop: set) -> Any:
+        """Remove dropped keys and null values, and tabulate uniform record lists"""
+        if isinstance(value, dict):
+            pruned = {}
+            for key, item in value.items():
+                if key in drop:
+                    continue
+                item = self._prune(item, drop)
+                if item is None:
+                    continue
+                pruned[key] = item
+            return pruned
+        if isinstance(value, (list, tuple)):
+            items = [self._prune(item, drop) for item in value]
+            return self._tabulate(items) if self.tabular else items
+        return value
+
+    @staticmethod
+    def _tabulate(items: list) -> Any:
+        """Turn a list of flat records sharing the same keys into columns + rows"""
+        if len(items) < 2 or not all(isinstance(item, dict) for item in items):
+            return items
+        columns = list(items[0])
+        if any(list(item) != columns for item in items):
+            return items
+        if any(isinstance(v, (dict, list)) for item in items for v in item.values()):
+            return items
+        return {"columns": columns, "rows": [list(item.values()) for item in items]}
+
+    def _summarise(self, value: Any, max_items: int, string_limit: Optional[int]) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {"columns", "rows"}:
+                rows = value["rows"]
+                shown = [[self._summarise(cell, max_items, string_limit) for cell in row] for row in rows[:max_items]]
+                summary = {"columns": value["columns"], "rows": shown}
+                if len(rows) > max_items:
+                    summary["omitted_rows"] = len(rows) - max_items
+                return summary
+            return {key: self._summarise(item, max_items, string_limit) for key, item in value.items()}
+        if isinstance(value, list):
+            shown = [self._summarise(item, max_items, string_limit) for item in value[:max_items]]
+            if len(value) > max_items:
+                return {"items": shown, "total": len(value), "omitted": len(value) - max_items}
+            return shown
+        if isinstance(value, str) and string_limit and len(value) > string_limit and not REFERENCE_PATTERN.match(value):
+            return value[:string_limit] + "…"
+        return value
+
+    def _record(self, tool: Optional[str], tokens: int, summarised: bool, over_budget: bool) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(tool or "unnamed", {"calls": 0, "tokens": 0, "summarised": 0, "over_budget": 0})
+            stats["calls"] += 1
+            stats["tokens"] += tokens
+            stats["summarised"] += int(summarised)
+            stats["over_budget"] += int(over_budget)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_tool = {
+                name: {**counts, "avg_tokens": round(counts["tokens"] / counts["calls"], 1)}
+                for name, counts in self._stats.items()
+            }
+        return {
+            "enabled": self.enabled,
+            "tokenizer": "tiktoken" if self._encoding is not None else "estimate",
+            "default_budget": self.default_budget,
+            "tools": per_tool
+        }
+
+
+# Global instance
+tool_output = ToolOutput()
@@ -0,0 +1,126 @@
+"""
+Tool call tracing for Contoso Agent Demo
+Per-agent concurrency limit and timing trace for the tool calls an agent makes in one turn
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.filters import FilterTypes, FunctionInvocationContext
+
+from utils.tool_context import ToolContext
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """Parse "Agent=limit,Agent=limit" into a dict"""
+    limits = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class ToolTrace:
+    """
+    Function invocation filter installed on each agent's kernel
+
+    When the model asks for several tools in one response, Semantic Kernel
+    invokes them concurrently; the filter caps how many of one agent's calls
+    run at once (TOOL_MAX_CONCURRENCY_PER_AGENT, per-agent overrides in
+    TOOL_AGENT_CONCURRENCY) and records when each call was queued, started
+    and finished, so overlap between calls is visible at /debug/tool-trace.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("TOOL_TRACE_ENABLED", "true").lower() == "true"
+        self.default_limit = int(os.getenv("TOOL_MAX_CONCURRENCY_PER_AGENT", "4"))
+        self.limits = _parse_limits(os.getenv("TOOL_AGENT_CONCURRENCY", ""))
+        self._entries: deque = deque(maxlen=int(os.getenv("TOOL_TRACE_SIZE", "500")))
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._origin = time.time() - time.perf_counter()
+
+    def limit_for(self, agent_name: str) -> int:
+        return self.limits.get(agent_name, self.default_limit)
+
+    def install(self, agent: ChatCompletionAgent, context: Optional[ToolContext] = None) -> None:
+        """
+        Add the limiting/tracing filter to an agent's kernel
+
+        Args:
+            agent: Agent whose tool calls to limit and trace
+            context: The agent's session context, so trace entries name the session
+        """
+        semaphore = asyncio.Semaphore(max(1, self.limit_for(agent.name)))
+        in_flight = {"count": 0}
+
+        async def tool_call_filter(invocation: FunctionInvocationContext, next) -> None:
+            queued = time.perf_counter()
+            async with semaphore:
+                started = time.perf_counter()
+                in_flight["count"] += 1
+                concurrent = in_flight["count"]
+                error = None
+                try:
+                    await next(invocation)
+                except Exception as e:
+                    error = str(e)
+                    raise
+                finally:
+                    in_flight["count"] -= 1
+                    if self.enabled:
+                        self._record(agent.name, invocation, context, queued, started, concurrent, error)
+
+        agent.kernel.add_filter(FilterTypes.FUNCTION_INVOCATION, tool_call_filter)
+
+    def _record(self, agent_name: str, invocation: FunctionInvocationContext, context: Optional[ToolContext],
+                queued: float, started: float, concurrent: int, error: Optional[str]) -> None:
+        finished = time.perf_counter()
+        entry = {
+            "call_id": next(self._ids),
+            "session_id": context.session_id if context else None,
+            "agent": agent_name,
+            "tool": invocation.function.fully_qualified_name,
+            "started_at": round(self._origin + started, 3),
+            "queue_ms": round((started - queued) * 1000, 2),
+            "run_ms": round((finished - started) * 1000, 2),
+            # Calls of this agent running when this one started, itself included
+            "concurrent": concurrent,
+            "status": "error" if error else "ok"
+        }
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self, session_id: str = None, agent: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent trace entries first, optionally for one session or agent"""
+        with self._lock:
+            entries = list(self._entries)
+        matching = [
+            entry for entry in reversed(entries)
+            if (session_id is None or entry["session_id"] == session_id) and (agent is None or entry["agent"] == agent)
+        ]
+        return matching[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._entries)
+        overlapped = sum(1 for entry in entries if entry["concurrent"] > 1)
+        return {
+            "enabled": self.enabled,
+            "default_limit": self.default_limit,
+            "traced_calls": len(entries),
+            "overlapped_calls": overlapped
+        }
+
+
+# Global instance
+tool_trace = ToolTrace()
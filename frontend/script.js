@@ -11,6 +11,7 @@ class ContosoChat {
         this.messageQueue = [];
         this.currentAgent = 'Alex';
         this.activeToolIndicators = new Map(); // Track active tool indicators
+        this.activeStreams = new Map(); // Track streaming agent messages by stream_id
         this.hasStartedConversation = false; // Track if user has sent first message
         
         this.initializeElements();
@@ -62,6 +63,13 @@ class ContosoChat {
             }
         });
         
+        // Cancel the in-flight request with Escape
+        this.elements.messageInput.addEventListener('keydown', (e) => {
+            if (e.key === 'Escape') {
+                this.cancelRequest();
+            }
+        });
+        
         // Conversation starters
         this.elements.conversationStarters.addEventListener('click', (e) => {
             if (e.target.classList.contains('starter-button')) {
@@ -179,7 +187,11 @@ class ContosoChat {
             case 'user_message':
                 this.addUserMessage(message.content);
                 break;
+            case 'agent_message_delta':
+                this.appendAgentDelta(message.agent, message.stream_id, message.content);
+                break;
             case 'agent_message':
+                this.removeStreamingMessage(message.stream_id);
                 this.addAgentMessage(message.agent, message.content, message.files, message.widgets);
                 this.hideLoading();
                 break;
@@ -192,6 +204,13 @@ class ContosoChat {
             case 'agent_working':
                 this.showAgentWorking(message.agent, message.content);
                 break;
+            case 'turn_cancelled':
+                this.activeStreams.forEach((stream, streamId) => this.removeStreamingMessage(streamId));
+                this.addSystemMessage(message.content);
+                this.hideLoading();
+                break;
+            case 'pong':
+                break;
             case 'error':
                 this.addErrorMessage(message.content);
                 this.hideLoading();
@@ -230,6 +249,13 @@ class ContosoChat {
         this.showLoading();
     }
     
+    cancelRequest() {
+        if (!this.isConnected || this.elements.loadingIndicator.style.display !== 'flex') {
+            return;
+        }
+        this.ws.send(JSON.stringify({ type: 'cancel' }));
+    }
+    
     addUserMessage(content) {
         const messageDiv = this.createMessageElement('user', 'You', content);
         this.elements.messages.appendChild(messageDiv);
@@ -299,6 +325,39 @@ class ContosoChat {
         this.scrollToBottom();
     }
     
+    appendAgentDelta(agent, streamId, delta) {
+        let stream = this.activeStreams.get(streamId);
+        
+        if (!stream) {
+            this.updateCurrentAgent(agent);
+            this.hideLoading();
+            
+            const messageDiv = this.createMessageElement(agent.toLowerCase(), agent, '');
+            messageDiv.classList.add('streaming');
+            this.elements.messages.appendChild(messageDiv);
+            
+            stream = {
+                element: messageDiv,
+                textElement: messageDiv.querySelector('.message-text'),
+                text: ''
+            };
+            this.activeStreams.set(streamId, stream);
+        }
+        
+        // Render plain text while streaming; the final agent_message renders markdown, files and widgets
+        stream.text += delta;
+        stream.textElement.textContent = stream.text;
+        this.scrollToBottom();
+    }
+    
+    removeStreamingMessage(streamId) {
+        if (!streamId || !this.activeStreams.has(streamId)) {
+            return;
+        }
+        this.activeStreams.get(streamId).element.remove();
+        this.activeStreams.delete(streamId);
+    }
+    
     addSystemMessage(content) {
         const messageDiv = document.createElement('div');
         messageDiv.className = 'message system';
@@ -370,6 +429,8 @@ class ContosoChat {
             'png': '🖼️',
             'jpg': '🖼️',
             'jpeg': '🖼️',
+            'webp': '🖼️',
+            'svg': '🖼️',
             'pdf': '📄',
             'json': '📋',
             'txt': '📝'
@@ -428,7 +489,7 @@ class ContosoChat {
         const fileType = file.file_type.toLowerCase();
         const icon = this.getFileIcon(fileType);
         
-        if (fileType === 'png' || fileType === 'jpg' || fileType === 'jpeg') {
+        if (['png', 'jpg', 'jpeg', 'webp', 'svg'].includes(fileType)) {
             // Inline image preview with click to expand
             return `
                 <div class="artifact-preview image-artifact" data-file-id="${file.file_id}" data-file-type="${fileType}">
@@ -438,7 +499,10 @@ class ContosoChat {
                         <button class="download-btn" onclick="event.stopPropagation(); downloadFile('${file.file_id}')">⬇️</button>
                     </div>
                     <div class="artifact-content">
-                        <img src="/files/${file.file_id}" alt="${file.description}" class="artifact-image" loading="lazy">
+                        <img src="/files/${file.file_id}?size=medium"
+                             srcset="/files/${file.file_id}?size=small 480w, /files/${file.file_id}?size=medium 800w"
+                             sizes="(max-width: 600px) 480px, 800px"
+                             alt="${file.description}" class="artifact-image" loading="lazy">
                         <div class="artifact-overlay">
                             <span>Click to view full size</span>
                         </div>
@@ -951,6 +1015,9 @@ class ContosoChat {
         // Clear any active tool indicators
         this.activeToolIndicators.clear();
         
+        // Drop any partially streamed messages
+        this.activeStreams.clear();
+        
         // Hide loading
         this.hideLoading();
         
@@ -983,7 +1050,7 @@ class ContosoChat {
             
             if (fileType === 'csv') {
                 await this.loadCsvPreview(fileId);
-            } else if (['png', 'jpg', 'jpeg'].includes(fileType)) {
+            } else if (['png', 'jpg', 'jpeg', 'webp', 'svg'].includes(fileType)) {
                 await this.loadImagePreview(fileId);
             } else {
                 this.elements.modalBody.innerHTML = `